@@ -0,0 +1,154 @@
+# alternatives.py
+import heapq
+import time
+
+from routing_graph import CANCEL_CHECK_MASK, INF, SearchCancelled
+
+# Without an overlap filter Yen's algorithm yields exactly k routes; with one,
+# give up after examining this many routes per requested alternative.
+MAX_ROUTES_PER_ALTERNATIVE = 8
+
+
+class _Stop:
+    """Cancel flag that also trips once the time budget runs out."""
+
+    def __init__(self, deadline, cancel):
+        self.deadline = deadline
+        self.cancel = cancel
+
+    def is_set(self):
+        if self.cancel is not None and self.cancel.is_set():
+            return True
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+
+def k_shortest_paths(graph, source, target, k, time_budget_ms=None, max_overlap=None, cancel=None):
+    """Yen's k shortest loopless paths over a CompactGraph.
+
+    Returns up to k (path_ids, distance) pairs, shortest first. Spur searches
+    share one reverse shortest-path tree from target: it gives the first
+    route, answers a spur outright whenever the spur node's own shortest
+    route avoids the banned nodes and edges, and otherwise serves as an
+    exact A* heuristic. Root-path costs come from prefix sums of the route
+    being extended instead of new searches.
+
+    time_budget_ms returns the best routes found once the budget runs out
+    (none if it runs out during the reverse tree). max_overlap (0..1) skips
+    routes sharing more than that fraction of their length with a route
+    already returned. Setting the cancel event raises SearchCancelled.
+    """
+    deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+    stop = _Stop(deadline, cancel)
+    accepted = []
+    try:
+        _yen(graph, source, target, k, max_overlap, stop, accepted)
+    except SearchCancelled:
+        if cancel is not None and cancel.is_set():
+            raise
+    return accepted
+
+
+def _yen(graph, source, target, k, max_overlap, stop, accepted):
+    """Append routes to accepted until k are found, raising SearchCancelled when stop is set."""
+    to_target, next_hop = graph.shortest_path_tree(target, reverse=True, cancel=stop)
+    if to_target[source] == INF:
+        return
+
+    first = _tree_path(next_hop, source, target)
+    found = [(first, to_target[source])]
+    accepted.append((first, graph.distance(to_target[source])))
+    candidates, seen = [], {tuple(first)}
+    limit = k * MAX_ROUTES_PER_ALTERNATIVE if max_overlap is not None else k
+
+    while len(accepted) < k and len(found) < limit:
+        path, _ = found[-1]
+        # prefix[i] = cost of path[:i + 1]
+        prefix = [0]
+        for u, v in zip(path, path[1:]):
+            prefix.append(prefix[-1] + _edge_weight(graph, u, v))
+
+        for i in range(len(path) - 1):
+            if stop.is_set():
+                raise SearchCancelled()
+            spur, root = path[i], path[:i + 1]
+            banned_edges = {p[i + 1] for p, _ in found if len(p) > i + 1 and p[:i + 1] == root}
+            banned_nodes = set(root[:-1])
+            spur_path = _spur_search(graph, spur, target, to_target, next_hop,
+                                     banned_nodes, banned_edges, stop)
+            if spur_path is None:
+                continue
+            spur_ids, spur_cost = spur_path
+            candidate = tuple(root[:-1]) + tuple(spur_ids)
+            if candidate not in seen:
+                seen.add(candidate)
+                heapq.heappush(candidates, (prefix[i] + spur_cost, candidate))
+
+        if not candidates:
+            break
+        cost, candidate = heapq.heappop(candidates)
+        route = list(candidate)
+        found.append((route, cost))
+        if max_overlap is None or _overlap(graph, route, cost, accepted) <= max_overlap:
+            accepted.append((route, graph.distance(cost)))
+
+
+def _tree_path(next_hop, source, target):
+    path = [source]
+    while path[-1] != target:
+        path.append(next_hop[path[-1]])
+    return path
+
+
+def _edge_weight(graph, u, v):
+    return min(graph.weights[e] for e in range(graph.offsets[u], graph.offsets[u + 1])
+               if graph.targets[e] == v)
+
+
+def _spur_search(graph, spur, target, to_target, next_hop, banned_nodes, banned_edges, stop):
+    """Shortest spur -> target route avoiding banned nodes and first hops."""
+    # Fast path: the spur node's own shortest route is still allowed
+    if to_target[spur] != INF and next_hop[spur] not in banned_edges:
+        route = _tree_path(next_hop, spur, target) if spur != target else [spur]
+        if banned_nodes.isdisjoint(route):
+            return route, to_target[spur]
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    dist, pred = {spur: 0}, {}
+    pq = [(to_target[spur], 0, spur)]
+    settled = 0
+    while pq:
+        _, d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if not settled & CANCEL_CHECK_MASK and stop.is_set():
+            raise SearchCancelled()
+        if u == target:
+            route = [u]
+            while u != spur:
+                u = pred[u]
+                route.append(u)
+            route.reverse()
+            return route, d
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if v in banned_nodes or (u == spur and v in banned_edges) or to_target[v] == INF:
+                continue
+            nd = d + weights[e]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(pq, (nd + to_target[v], nd, v))
+    return None
+
+
+def _overlap(graph, route, cost, accepted):
+    """Largest fraction of route's length shared with any accepted route."""
+    if not cost:
+        return 1.0
+    edges = set(zip(route, route[1:]))
+    worst = 0.0
+    for other, _ in accepted:
+        shared = sum(_edge_weight(graph, u, v) for u, v in zip(other, other[1:]) if (u, v) in edges)
+        worst = max(worst, shared / cost)
+    return worst
@@ -0,0 +1,182 @@
+# benchmarks/campus_bench.py
+"""Routing benchmark over synthetic campus graphs.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.campus_bench --edges 1000 10000 100000 \
+        --methods dijkstra bidirectional alt --output bench_results.json
+    python -m benchmarks.campus_bench --compare old.json --output new.json
+
+For every campus kind and size it reports build time, peak memory and,
+per method and workload, p50/p95/p99 latency and mean nodes settled.
+Workloads are fixed by the seed: "hot" sends 80% of queries from a few
+popular origins (skewed like real kiosk traffic), "cold" uses uniformly
+random pairs.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generators import campus_with_edges
+from navigation import Navigation
+from route_cache import TreeCache
+
+HOT_SOURCES = 5
+HOT_SHARE = 0.8
+
+
+def workloads(names, queries, seed):
+    rng = random.Random(seed)
+    hot = rng.sample(names, min(HOT_SOURCES, len(names)))
+    # Zipf-like skew among the hot origins
+    hot_weights = [1 / (rank + 1) for rank in range(len(hot))]
+    hot_pairs = []
+    for _ in range(queries):
+        if rng.random() < HOT_SHARE:
+            origin = rng.choices(hot, hot_weights)[0]
+        else:
+            origin = rng.choice(names)
+        hot_pairs.append((origin, rng.choice(names)))
+    cold_pairs = [(rng.choice(names), rng.choice(names)) for _ in range(queries)]
+    return {"hot": hot_pairs, "cold": cold_pairs}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def prepare(nav, method):
+    # build_s measures preprocessing, so never load it from a saved file
+    if method == "alt":
+        nav.prepare_landmarks(filename=None)
+    elif method == "ch":
+        nav.prepare_contraction(filename=None)
+
+
+def build(graph, coordinates, method):
+    nav = Navigation(coordinates)
+    nav.graph = graph
+    nav.compiled()
+    prepare(nav, method)
+    return nav
+
+
+def run_case(kind, edges, methods, queries, seed, measure_memory):
+    graph, coordinates = campus_with_edges(kind, edges, seed)
+    names = list(graph)
+    loads = workloads(names, queries, seed)
+    results = []
+    for method in methods:
+        started = time.perf_counter()
+        nav = build(graph, coordinates, method)
+        build_seconds = time.perf_counter() - started
+
+        peak = None
+        if measure_memory:
+            tracemalloc.start()
+            build(graph, coordinates, method)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        compiled = nav.compiled()
+        for workload, pairs in loads.items():
+            # each workload starts from a cold tree cache with fresh counters
+            nav.tree_cache = TreeCache(nav.tree_cache.max_trees)
+            latencies, settled = [], 0
+            for start, end in pairs:
+                t = time.perf_counter()
+                nav.shortest_path(start, end, method=method)
+                latencies.append((time.perf_counter() - t) * 1000)
+                settled += nav.last_settled
+            latencies.sort()
+            results.append({
+                "kind": kind,
+                "target_edges": edges,
+                "nodes": len(compiled),
+                "edges": compiled.edge_count,
+                "method": method,
+                "workload": workload,
+                "queries": len(pairs),
+                "build_s": round(build_seconds, 4),
+                "peak_build_bytes": peak,
+                "p50_ms": round(percentile(latencies, 50), 4),
+                "p95_ms": round(percentile(latencies, 95), 4),
+                "p99_ms": round(percentile(latencies, 99), 4),
+                "mean_settled": round(settled / len(pairs), 1),
+                "tree_cache": nav.cache_stats(),
+            })
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_results, new_results):
+    """Print p50/p95 ratios (new / old) for cases present in both runs."""
+    key = lambda r: (r["kind"], r["target_edges"], r["method"], r["workload"])
+    old = {key(r): r for r in old_results}
+    print(f"\n{'case':<42} {'p50 new/old':>12} {'p95 new/old':>12}")
+    for r in new_results:
+        before = old.get(key(r))
+        if before and before["p50_ms"] and before["p95_ms"]:
+            case = "/".join(map(str, key(r)))
+            print(f"{case:<42} {r['p50_ms'] / before['p50_ms']:>11.2f}x "
+                  f"{r['p95_ms'] / before['p95_ms']:>11.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kinds", nargs="+", default=["grid", "buildings", "geometric"])
+    parser.add_argument("--edges", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--methods", nargs="+", default=["dijkstra", "bidirectional", "alt"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc build pass")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'kind':<10} {'edges':>8} {'method':<14} {'load':<5} {'build s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'settled':>9} {'peak MiB':>9}")
+    for kind in args.kinds:
+        for edges in args.edges:
+            for r in run_case(kind, edges, args.methods, args.queries, args.seed, not args.no_memory):
+                results.append(r)
+                peak = f"{r['peak_build_bytes'] / 2 ** 20:.1f}" if r["peak_build_bytes"] else "-"
+                print(f"{kind:<10} {r['edges']:>8} {r['method']:<14} {r['workload']:<5} {r['build_s']:>8.2f} "
+                      f"{r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+                      f"{r['mean_settled']:>9.1f} {peak:>9}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f)["results"], results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/closures.py
+"""Incremental tree repair vs. full recompute as edge closures accumulate.
+
+Run from the repository root:  python -m benchmarks.closures
+"""
+import random
+import sys
+import time
+
+from navigation import Navigation
+from benchmarks.generators import grid_campus
+
+
+def main(size=80, sources=16, steps=(1, 2, 4, 8, 16, 32, 64), seed=1):
+    graph, coordinates = grid_campus(size, size, seed)
+    rng = random.Random(seed)
+    names = list(graph)
+    origins = rng.sample(names, sources)
+    edges = [(a, b) for a in graph for b, _ in graph[a] if a < b]
+
+    print(f"{len(names)} nodes, {sum(map(len, graph.values()))} edges, {sources} cached trees")
+    print(f"{'closures':>9} {'repair ms':>10} {'recompute ms':>13} {'speedup':>8} {'relabelled':>11}")
+    for count in steps:
+        nav = Navigation(coordinates, max_cached_trees=sources)
+        nav.graph = {name: list(neighbors) for name, neighbors in graph.items()}
+        for origin in origins:
+            nav.shortest_path(origin, origins[0])
+        closures = rng.sample(edges, count)
+
+        relabelled = 0
+        started = time.perf_counter()
+        for a, b in closures:
+            nav.close_edge(a, b)
+            relabelled += nav.last_repair["relabelled"]
+        repair = time.perf_counter() - started
+
+        # Baseline: drop every cached tree after each closure and rebuild them
+        started = time.perf_counter()
+        for _ in closures:
+            for origin in origins:
+                nav.compiled().shortest_path_tree(nav.compiled().index[origin])
+        recompute = time.perf_counter() - started
+
+        print(f"{count:>9} {repair * 1000:>10.1f} {recompute * 1000:>13.1f} "
+              f"{recompute / repair:>7.1f}x {relabelled:>11}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,111 @@
+# benchmarks/generators.py
+"""Synthetic campus graphs in Navigation's dict format."""
+import random
+
+
+def grid_campus(width, height, seed=0, keep=0.9):
+    """Grid of walkways (like quads) with some segments missing.
+
+    Returns (graph, coordinates); edge weights are 10-15 m per block.
+    """
+    rng = random.Random(seed)
+    graph = {f"N{x}_{y}": [] for x in range(width) for y in range(height)}
+    coordinates = {f"N{x}_{y}": (x * 10.0, y * 10.0) for x in range(width) for y in range(height)}
+    for x in range(width):
+        for y in range(height):
+            for dx, dy in ((1, 0), (0, 1)):
+                if x + dx < width and y + dy < height and rng.random() < keep:
+                    a, b = f"N{x}_{y}", f"N{x + dx}_{y + dy}"
+                    weight = rng.randint(10, 15)
+                    graph[a].append((b, weight))
+                    graph[b].append((a, weight))
+    return graph, coordinates
+
+
+def building_campus(buildings, floors=4, corridor=10, seed=0):
+    """Buildings on an outdoor grid, each with floors of corridors and rooms.
+
+    Every corridor node has two rooms; stairs join the ends of each floor's
+    corridor to the floor above, and the ground-floor corridor start is the
+    building entrance. Returns (graph, coordinates).
+    """
+    rng = random.Random(seed)
+    side = max(1, round(buildings ** 0.5))
+    graph, coordinates = {}, {}
+
+    def link(a, b, weight):
+        graph[a].append((b, weight))
+        graph[b].append((a, weight))
+
+    def add(name, x, y):
+        graph[name] = []
+        coordinates[name] = (x, y)
+
+    spacing = corridor * 10 + 60
+    for b in range(buildings):
+        bx, by = (b % side) * spacing, (b // side) * spacing
+        add(f"Gate{b}", bx - 20.0, by - 20.0)
+        for f in range(floors):
+            for c in range(corridor):
+                hall = f"B{b}F{f}C{c}"
+                add(hall, bx + c * 10.0, by)
+                if c:
+                    link(f"B{b}F{f}C{c - 1}", hall, rng.randint(10, 12))
+                for offset, suffix in ((-4.0, "a"), (4.0, "b")):
+                    room = f"B{b}F{f}R{c}{suffix}"
+                    add(room, bx + c * 10.0, by + offset)
+                    link(hall, room, rng.randint(4, 6))
+            if f:
+                for c in (0, corridor - 1):
+                    link(f"B{b}F{f - 1}C{c}", f"B{b}F{f}C{c}", 15)
+        link(f"Gate{b}", f"B{b}F0C0", 30)
+    # Outdoor paths between neighboring building gates
+    for b in range(buildings):
+        for nb in (b + 1 if (b + 1) % side else None, b + side):
+            if nb is not None and nb < buildings and rng.random() < 0.9:
+                link(f"Gate{b}", f"Gate{nb}", spacing + rng.randint(0, 40))
+    return graph, coordinates
+
+
+def geometric_campus(nodes, degree=6, seed=0):
+    """Random geometric graph: points in a square, linked within a radius.
+
+    The radius is chosen for roughly `degree` neighbors per point; weights
+    are the straight-line distance stretched by up to 30%.
+    """
+    rng = random.Random(seed)
+    size = (nodes ** 0.5) * 20.0
+    radius = size * (degree / (3.14159 * nodes)) ** 0.5
+    points = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(nodes)]
+    graph = {f"P{i}": [] for i in range(nodes)}
+    coordinates = {f"P{i}": p for i, p in enumerate(points)}
+
+    # Bucket points into radius-sized cells so only nearby pairs are compared
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(i)
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in cells.get((cx + dx, cy + dy), ()):
+                    for i in members:
+                        if i < j:
+                            (x1, y1), (x2, y2) = points[i], points[j]
+                            d = ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+                            if d <= radius:
+                                weight = int(d * rng.uniform(1.0, 1.3)) + 1
+                                graph[f"P{i}"].append((f"P{j}", weight))
+                                graph[f"P{j}"].append((f"P{i}", weight))
+    return graph, coordinates
+
+
+def campus_with_edges(kind, edges, seed=0):
+    """Generate a campus of the given kind with roughly `edges` directed edges."""
+    if kind == "grid":
+        side = max(2, round((edges / 3.6) ** 0.5))
+        return grid_campus(side, side, seed)
+    if kind == "buildings":
+        return building_campus(max(1, round(edges / 250)), seed=seed)
+    if kind == "geometric":
+        return geometric_campus(max(10, round(edges / 6)), seed=seed)
+    raise ValueError(f"Unknown campus kind: {kind!r}")
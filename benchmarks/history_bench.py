@@ -0,0 +1,59 @@
+# benchmarks/history_bench.py
+"""LinkedHistory vs. RingHistory vs. IndexedHistory on the operations the GUI performs.
+
+Run from the repository root:  python -m benchmarks.history_bench [entries]
+"""
+import sys
+import timeit
+
+from history import IndexedHistory, LinkedHistory, RingHistory
+
+
+def nth(history, n):
+    """Entry n the way callers had to reach it before indexed access."""
+    if isinstance(history, RingHistory):
+        return history[n]
+    current = history.head
+    for _ in range(n):
+        current = current.next
+    return current.data
+
+
+def newest_first(history):
+    if isinstance(history, RingHistory):
+        return list(reversed(history))
+    return history.get_all()[::-1]
+
+
+def main(entries=100_000):
+    items = [f"Path Building {i % 997} -> Building {(i * 7) % 991}" for i in range(2 * entries)]
+    full = {}
+    for cls in (LinkedHistory, RingHistory, IndexedHistory):
+        history = cls(max_entries=entries)
+        for item in items:
+            history.add(item)
+        full[cls] = history
+
+    cases = [
+        ("add (evicting)", lambda h: [h.add(item) for item in items[:10_000]], 1, 10_000),
+        ("get_all", lambda h: h.get_all(), 10, 1),
+        ("item #n (middle)", lambda h: nth(h, entries // 2), 10, 1),
+        ("newest first", newest_first, 10, 1),
+        ("search", lambda h: h.search("building 42 "), 3, 1),
+        ("search (rare)", lambda h: h.search("building 996 -> building 7"), 3, 1),
+    ]
+    print(f"{entries} entries (times per call)")
+    print(f"{'operation':<18} {'linked':>12} {'ring':>12} {'indexed':>12} {'speedup':>8}")
+    for name, op, repeat, per in cases:
+        times = {}
+        for cls, history in full.items():
+            times[cls] = min(timeit.repeat(lambda: op(history), number=1, repeat=repeat)) / per
+        linked, ring, indexed = times[LinkedHistory], times[RingHistory], times[IndexedHistory]
+        print(f"{name:<18} {linked * 1e6:>10.2f}us {ring * 1e6:>10.2f}us {indexed * 1e6:>10.2f}us "
+              f"{linked / min(ring, indexed):>7.1f}x")
+    stats = full[IndexedHistory].index.stats()
+    print(f"index: {stats['trigrams']} trigrams, {stats['tokens']} words, {stats['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
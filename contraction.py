@@ -0,0 +1,331 @@
+# contraction.py
+import heapq
+import os
+import pickle
+import sys
+import time
+from array import array
+
+from route_cache import TreeCache
+from routing_graph import INF, count_heap_ops
+
+CH_FORMAT = 1
+# Where Navigation keeps its hierarchy between runs (next to this module,
+# whatever the working directory); reused only for the same graph
+CH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hierarchy.pkl")
+
+# Witness searches give up after settling this many nodes; a missed
+# witness only costs an unnecessary shortcut, never a wrong answer.
+WITNESS_SETTLE_LIMIT = 500
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over a CompactGraph.
+
+    Nodes are contracted one at a time in order of importance; whenever
+    removing a node would break a shortest path u -> v -> w, a shortcut
+    u -> w is added. A query then only needs to search "upwards" (towards
+    more important nodes) from both ends. Shortcuts remember the node they
+    bypass so paths can be unpacked to original edges.
+    """
+
+    def __init__(self, fingerprint, rank, up, down, middles, build_seconds=0.0):
+        self.fingerprint = fingerprint
+        self.rank = rank
+        # up: edges u -> w with rank[w] > rank[u]
+        # down: reversed edges u -> w with rank[u] > rank[w], stored at w
+        self.up = up
+        self.down = down
+        self.middles = middles  # {(u, w): bypassed node} for shortcuts
+        self.build_seconds = build_seconds
+
+    # ---------------- Preprocessing ----------------
+    @classmethod
+    def build(cls, graph):
+        started = time.perf_counter()
+        n = len(graph)
+        out_adj = [{} for _ in range(n)]
+        in_adj = [{} for _ in range(n)]
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                w, weight = graph.targets[e], graph.weights[e]
+                if w != u and weight < out_adj[u].get(w, (INF,))[0]:
+                    out_adj[u][w] = (weight, -1)
+                    in_adj[w][u] = (weight, -1)
+
+        contracted = [False] * n
+        deleted_neighbors = [0] * n
+        level = [0] * n
+        rank = array("i", [0]) * n
+
+        def shortcuts_for(v):
+            found = []
+            outgoing = [(w, d) for w, (d, _) in out_adj[v].items() if not contracted[w]]
+            if not outgoing:
+                return found
+            for u, (d_uv, _) in in_adj[v].items():
+                if contracted[u]:
+                    continue
+                limit = max(d_uv + d_vw for _, d_vw in outgoing)
+                witness = _witness_search(out_adj, contracted, u, v, limit)
+                for w, d_vw in outgoing:
+                    if w != u and witness.get(w, INF) > d_uv + d_vw:
+                        found.append((u, w, d_uv + d_vw))
+            return found
+
+        def priority(v):
+            degree = sum(1 for u in in_adj[v] if not contracted[u]) + \
+                sum(1 for w in out_adj[v] if not contracted[w])
+            return 2 * (len(shortcuts_for(v)) - degree) + deleted_neighbors[v] + level[v]
+
+        pq = [(priority(v), v) for v in range(n)]
+        heapq.heapify(pq)
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+            # Lazy update: re-queue if v is no longer the cheapest node
+            current = priority(v)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+
+            for u, w, d in shortcuts_for(v):
+                if d < out_adj[u].get(w, (INF,))[0]:
+                    out_adj[u][w] = (d, v)
+                    in_adj[w][u] = (d, v)
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+            for x in list(in_adj[v]) + list(out_adj[v]):
+                deleted_neighbors[x] += 1
+                level[x] = max(level[x], level[v] + 1)
+
+        up, down = [[] for _ in range(n)], [[] for _ in range(n)]
+        middles = {}
+        for u in range(n):
+            for w, (d, middle) in out_adj[u].items():
+                if middle != -1:
+                    middles[(u, w)] = middle
+                if rank[w] > rank[u]:
+                    up[u].append((w, d))
+                else:
+                    down[w].append((u, d))
+        # Closing an edge widens the weights to doubles (INF) while distances stay integral
+        typecode = graph.weights.typecode
+        return cls(graph.fingerprint(), rank, _Csr(up, typecode),
+                   _Csr(down, typecode), middles, time.perf_counter() - started)
+
+    # ---------------- Queries ----------------
+    def query(self, source, target, counters=None):
+        """Bidirectional upward search. Returns (path_ids, distance, settled)."""
+        if source == target:
+            return [], 0, 0
+        dist = ({source: 0}, {target: 0})
+        pred = ({}, {})
+        queues = ([(0, source)], [(0, target)])
+        graphs = (self.up, self.down)
+        best, meet, settled, stale = INF, -1, 0, 0
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while True:
+            # A side is finished once its queue can no longer improve on the
+            # best meeting point; otherwise expand the cheaper side.
+            top_f = queues[0][0][0] if queues[0] else INF
+            top_b = queues[1][0][0] if queues[1] else INF
+            if min(top_f, top_b) >= best:
+                break
+            side = 0 if top_f <= top_b else 1
+            d, u = heappop(queues[side])
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[u]:
+                stale += 1
+                continue
+            settled += 1
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            # Stall-on-demand: if a more important node already reaches u
+            # more cheaply, u cannot be on a shortest up-down path.
+            offsets, targets, weights = graphs[1 - side].arrays()
+            stalled = False
+            for e in range(offsets[u], offsets[u + 1]):
+                if mine.get(targets[e], INF) + weights[e] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            offsets, targets, weights = graphs[side].arrays()
+            queue, prev = queues[side], pred[side]
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = d + weights[e]
+                if nd < mine.get(v, INF):
+                    mine[v] = nd
+                    prev[v] = u
+                    heappush(queue, (nd, v))
+
+        if counters is not None:
+            count_heap_ops(counters, settled, stale, len(queues[0]) + len(queues[1]))
+        if meet == -1:
+            return [], INF, settled
+        # Upward edges source..meet, then the backward tree meet..target
+        hops = []
+        node = meet
+        while node != source:
+            hops.append((pred[0][node], node))
+            node = pred[0][node]
+        hops.reverse()
+        node = meet
+        while node != target:
+            hops.append((node, pred[1][node]))
+            node = pred[1][node]
+        path = [source]
+        for u, w in hops:
+            self._unpack(u, w, path)
+        return path, best, settled
+
+    def _unpack(self, u, w, path):
+        """Append the original nodes of edge u -> w (excluding u) to path."""
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            middle = self.middles.get((a, b))
+            if middle is None:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+
+    # ---------------- Reporting / persistence ----------------
+    @property
+    def shortcut_count(self):
+        return len(self.middles)
+
+    def nbytes(self):
+        """Approximate in-memory size of the hierarchy arrays."""
+        return self.rank.itemsize * len(self.rank) + self.up.nbytes() + \
+            self.down.nbytes() + 12 * len(self.middles)
+
+    def save(self, filename):
+        data = {
+            "format": CH_FORMAT,
+            "fingerprint": self.fingerprint,
+            "build_seconds": self.build_seconds,
+            "rank": self.rank.tobytes(),
+            "up": self.up.dump(),
+            "down": self.down.dump(),
+            "middles": array("i", [x for (u, w), m in self.middles.items() for x in (u, w, m)]).tobytes(),
+        }
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """Load a saved hierarchy, or return None if missing or built for another graph."""
+        try:
+            with open(filename, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if data.get("format") != CH_FORMAT or data.get("fingerprint") != graph.fingerprint():
+            return None
+        rank = array("i")
+        rank.frombytes(data["rank"])
+        flat = array("i")
+        flat.frombytes(data["middles"])
+        middles = {(flat[i], flat[i + 1]): flat[i + 2] for i in range(0, len(flat), 3)}
+        return cls(data["fingerprint"], rank, _Csr.restore(data["up"]),
+                   _Csr.restore(data["down"]), middles, data["build_seconds"])
+
+
+class _Csr:
+    """Flat adjacency arrays for one direction of the hierarchy."""
+
+    def __init__(self, adjacency=None, typecode="i"):
+        self.offsets = array("q", [0])
+        self.targets = array("i")
+        self.weights = array(typecode)
+        for edges in adjacency or ():
+            for v, d in edges:
+                self.targets.append(v)
+                self.weights.append(d)
+            self.offsets.append(len(self.targets))
+
+    def arrays(self):
+        return self.offsets, self.targets, self.weights
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in self.arrays())
+
+    def dump(self):
+        return tuple((a.typecode, a.tobytes()) for a in self.arrays())
+
+    @classmethod
+    def restore(cls, dumped):
+        csr = cls()
+        loaded = []
+        for typecode, raw in dumped:
+            a = array(typecode)
+            a.frombytes(raw)
+            loaded.append(a)
+        csr.offsets, csr.targets, csr.weights = loaded
+        return csr
+
+
+def _witness_search(out_adj, contracted, source, skip, limit):
+    """Bounded Dijkstra from source that avoids `skip` and contracted nodes."""
+    dist = {source: 0}
+    pq = [(0, source)]
+    settled = 0
+    while pq and settled < WITNESS_SETTLE_LIMIT:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if d > limit:
+            break
+        settled += 1
+        for v, (weight, _) in out_adj[u].items():
+            if v == skip or contracted[v]:
+                continue
+            nd = d + weight
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def report(nav, hierarchy, queries=1000, seed=1):
+    """Print preprocessing time, hierarchy size and CH vs Dijkstra latency.
+
+    The tree cache is switched off while timing, so every query really
+    runs the method's search.
+    """
+    import random
+
+    graph = nav.compiled()
+    rng = random.Random(seed)
+    names = [name for name in graph.names if name in nav.graph]
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(queries)]
+    print(f"nodes: {len(graph)}  edges: {graph.edge_count}")
+    print(f"preprocessing: {hierarchy.build_seconds:.2f} s")
+    print(f"shortcuts: {hierarchy.shortcut_count}  size: {hierarchy.nbytes() / 1024:.1f} KiB")
+    cache, nav.tree_cache = nav.tree_cache, TreeCache(0)
+    try:
+        for method in ("dijkstra", "ch"):
+            started = time.perf_counter()
+            for start, end in pairs:
+                nav.shortest_path(start, end, method=method)
+            per_query = (time.perf_counter() - started) / len(pairs)
+            print(f"{method:>9}: {per_query * 1000:.3f} ms/query")
+    finally:
+        nav.tree_cache = cache
+
+
+if __name__ == "__main__":
+    from navigation import Navigation
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else "campus.ch"
+    nav = Navigation()
+    report(nav, nav.prepare_contraction(filename))
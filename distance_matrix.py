@@ -0,0 +1,77 @@
+# distance_matrix.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Below this many sources a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+class DistanceMatrix:
+    """Many-to-many distances plus the predecessor arrays to rebuild paths.
+
+    distances[i, j] is the distance from sources[i] to targets[j] (inf when
+    unreachable). Paths are only materialized when path() is asked for one.
+    """
+
+    def __init__(self, graph, sources, targets, distances, preds):
+        self.graph = graph
+        self.sources = sources
+        self.targets = targets
+        self.distances = distances
+        self._preds = preds  # one int32 predecessor row per source
+        self._source_row = {name: i for i, name in enumerate(sources)}
+        self._target_col = {name: j for j, name in enumerate(targets)}
+
+    def __getitem__(self, key):
+        source, target = key
+        return self.distances[self._source_row[source], self._target_col[target]]
+
+    def path(self, source, target):
+        """Return the shortest path from source to target as a list of names."""
+        row = self._source_row[source]
+        graph = self.graph
+        ids = graph.path_ids(self._preds[row], graph.index[source], graph.index[target])
+        return [graph.names[i] for i in ids]
+
+
+def compute(graph, sources, targets, workers=None):
+    """Run one early-exit Dijkstra per source over a CompactGraph.
+
+    workers=None uses a process pool only for large source sets; pass 0 or 1
+    to stay in-process, or a number to force that many worker processes.
+    """
+    source_ids = [graph.index[name] for name in sources]
+    target_ids = [graph.index[name] for name in targets]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(sources) >= PARALLEL_THRESHOLD else 1
+
+    distances = np.empty((len(sources), len(targets)), dtype=np.float64)
+    preds = np.empty((len(sources), len(graph)), dtype=np.int32)
+    if workers > 1:
+        chunksize = max(1, len(source_ids) // (workers * 4))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(graph,)) as pool:
+            rows = pool.map(_search, source_ids, [target_ids] * len(source_ids), chunksize=chunksize)
+            for i, (dist_row, pred_row) in enumerate(rows):
+                distances[i] = dist_row
+                preds[i] = np.frombuffer(pred_row, dtype=np.int32)
+    else:
+        for i, source in enumerate(source_ids):
+            dist, pred = graph.shortest_path_tree(source, targets=target_ids)
+            distances[i] = [dist[t] for t in target_ids]
+            preds[i] = pred
+    return DistanceMatrix(graph, list(sources), list(targets), distances, preds)
+
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _search(source, target_ids):
+    dist, pred = _worker_graph.shortest_path_tree(source, targets=target_ids)
+    return [dist[t] for t in target_ids], np.asarray(pred, dtype=np.int32).tobytes()
@@ -1,11 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from constants import *
+from facilities import EMERGENCY_FACILITIES
 
 
 class EmergencyTab:
     def __init__(self, notebook, app):
         self.app = app
+        
+        # Precompute nearest-facility lookups so Navigate answers instantly
+        for kind, locations in EMERGENCY_FACILITIES.items():
+            self.app.nav.set_facilities(kind, locations)
         self.tab = tk.Frame(notebook, bg=BACKGROUND_COLOR)
         notebook.add(self.tab, text="🚨 Emergency")
         
@@ -114,11 +119,17 @@ class EmergencyTab:
         messagebox.showinfo("Emergency Call", f"Simulating call to {number}\n\nIn a real application, this would dial the number.")
 
     def navigate_to_emergency(self, location):
-        """Navigate to emergency location"""
-        self.app.navigation_tab.start_var.set("Main Entrance")  # Default start point
-        self.app.navigation_tab.end_var.set(location)
+        """Navigate to the nearest facility of the selected kind"""
+        start = self.app.navigation_tab.start_var.get() or "Main Entrance"  # Default start point
+        facility, path, distance = self.app.nav.nearest_facility(location, start)
+        
+        self.app.navigation_tab.start_var.set(start)
+        self.app.navigation_tab.end_var.set(facility or location)
         self.app.notebook.select(0)  # Switch to navigation tab
-        self.app.update_status(f"Setting destination to {location}")
+        if facility:
+            self.app.update_status(f"Nearest {location}: {facility} ({distance} meters)")
+        else:
+            self.app.update_status(f"Setting destination to {location}")
 
     def share_location(self):
         """Share current location (simulated)"""
@@ -0,0 +1,43 @@
+# facilities.py
+from routing_graph import INF
+
+# Graph locations offering each emergency service; names missing from the
+# campus graph are ignored
+EMERGENCY_FACILITIES = {
+    "Medical Center": ["Medical Center"],
+    "Security Office": ["Security Office", "Main Gate"],
+    "Emergency Assembly": ["Emergency Assembly", "Auditorium"],
+    "First Aid Stations": ["Library", "Admin Block", "Engineering Faculty", "IT Faculty", "Science Faculty"],
+}
+
+
+class FacilityForest:
+    """Shortest-path forest towards every facility of one kind.
+
+    Built with a single multi-source Dijkstra over the reverse graph, so
+    dist[v] is the distance from v to its nearest facility and pred[v] is
+    the next hop on the way there (-1 at the facilities themselves).
+    """
+
+    __slots__ = ("kind", "sources", "dist", "pred", "version")
+
+    def __init__(self, kind, sources, dist, pred, version):
+        self.kind = kind
+        self.sources = sources
+        self.dist = dist
+        self.pred = pred
+        self.version = version
+
+    @classmethod
+    def build(cls, graph, kind, sources, version):
+        dist, pred = graph.shortest_path_tree(list(sources), reverse=True)
+        return cls(kind, list(sources), dist, pred, version)
+
+    def route(self, v):
+        """Return (path_ids, distance) from v to its nearest facility."""
+        if self.dist[v] == INF:
+            return [], INF
+        path = [v]
+        while self.pred[path[-1]] != -1:
+            path.append(self.pred[path[-1]])
+        return path, self.dist[v]
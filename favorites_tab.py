@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from datetime import date
 from constants import *
 
 
@@ -58,6 +59,8 @@ class FavoritesTab:
                   command=lambda: self.use_favorite_location("end")).pack(side="left", padx=5)
         ttk.Button(loc_btn_frame, text="Remove", style="Secondary.TButton",
                   command=self.remove_favorite_location).pack(side="left", padx=5)
+        ttk.Button(loc_btn_frame, text="Plan Tour", style="Success.TButton",
+                  command=self.plan_tour).pack(side="left", padx=5)
         
         # Populate routes tab
         tk.Label(route_frame, text="Favorite Routes", 
@@ -98,6 +101,29 @@ class FavoritesTab:
         for route in self.app.favorites.get("routes", []):
             self.route_listbox.insert(tk.END, f"{route['name']}: {route['start']} → {route['end']}")
 
+    def plan_tour(self):
+        """Plan one route through all favorite locations and today's event venues"""
+        stops = list(self.app.favorites.get("locations", []))
+        today = date.today().strftime("%Y-%m-%d")
+        for e in self.app.events.get_all():
+            parts = e.split(" - ")
+            if len(parts) >= 3 and parts[1] == today:
+                stops.append(parts[2])
+        stops = [stop for stop in stops if stop in self.app.nav.graph]
+        if len(stops) < 2:
+            messagebox.showwarning("Warning", "Add at least two favorite locations or events for today")
+            return
+        
+        start = self.app.navigation_tab.start_var.get() or None
+        try:
+            order, path, distance = self.app.nav.plan_tour(stops, start=start, time_limit_ms=300)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Cannot plan tour: {e}")
+            return
+        messagebox.showinfo("Tour Plan", f"Visit order:\n{' → '.join(order)}\n\n"
+                            f"Full route:\n{' → '.join(path)}\n\nTotal distance: {distance} meters")
+        self.app.update_status(f"Planned tour of {len(order)} stops ({distance} meters)")
+
     def add_current_to_favorites(self):
         """Add current location to favorites"""
         if not self.app.navigation_tab.start_var.get():
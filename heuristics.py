@@ -0,0 +1,133 @@
+# heuristics.py
+import math
+import os
+import pickle
+from array import array
+
+from routing_graph import INF
+
+LANDMARK_FORMAT = 1
+# Where Navigation keeps its landmark tables between runs (next to this
+# module, whatever the working directory); reused only for the same graph
+LANDMARK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "landmarks.pkl")
+
+
+def euclidean_heuristic(graph, coordinates, target):
+    """Straight-line lower bound to target for A* over a CompactGraph.
+
+    coordinates maps node name -> (x, y) in the same unit as edge weights.
+    Nodes without a position (or a target without one) get a bound of 0,
+    which keeps the search correct but unguided there.
+    """
+    goal = coordinates.get(graph.names[target])
+    if goal is None:
+        return lambda v: 0
+    gx, gy = goal
+    xs = [INF] * len(graph)
+    ys = [INF] * len(graph)
+    for name, (x, y) in coordinates.items():
+        i = graph.index.get(name)
+        if i is not None:
+            xs[i], ys[i] = x, y
+    hypot = math.hypot
+
+    def heuristic(v):
+        x = xs[v]
+        if x == INF:
+            return 0
+        return hypot(x - gx, ys[v] - gy)
+
+    return heuristic
+
+
+class LandmarkTable:
+    """Precomputed distances to and from a few landmark nodes (ALT).
+
+    For any landmark L the triangle inequality gives
+    d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L),
+    so the best of these over all landmarks is an admissible A* heuristic.
+    """
+
+    def __init__(self, fingerprint, landmarks, dist_from, dist_to):
+        self.fingerprint = fingerprint
+        self.landmarks = landmarks
+        self.dist_from = dist_from  # dist_from[k][v] = d(landmark k, v)
+        self.dist_to = dist_to      # dist_to[k][v] = d(v, landmark k)
+
+    @classmethod
+    def build(cls, graph, count=8):
+        """Pick landmarks farthest-first and compute their distance tables."""
+        n = len(graph)
+        landmarks, dist_from, dist_to = [], [], []
+        if n == 0:
+            return cls(graph.fingerprint(), landmarks, dist_from, dist_to)
+        # Seed with the node farthest from node 0, then keep adding the node
+        # farthest from every landmark chosen so far.
+        seed, _ = graph.shortest_path_tree(0)
+        nearest = [d if d != INF else -1 for d in seed]
+        candidate = max(range(n), key=nearest.__getitem__)
+        nearest = [INF] * n
+        while len(landmarks) < min(count, n):
+            landmarks.append(candidate)
+            forward, _ = graph.shortest_path_tree(candidate)
+            backward, _ = graph.shortest_path_tree(candidate, reverse=True)
+            dist_from.append(array("d", forward))
+            dist_to.append(array("d", backward))
+            nearest = [min(a, b) for a, b in zip(nearest, forward)]
+            nearest[candidate] = -1
+            candidate = max(range(n), key=lambda v: nearest[v] if nearest[v] != INF else -1)
+            if nearest[candidate] <= 0:
+                break
+        return cls(graph.fingerprint(), landmarks, dist_from, dist_to)
+
+    def heuristic(self, target):
+        """Return the ALT lower bound function towards target."""
+        terms = []
+        for d_from, d_to in zip(self.dist_from, self.dist_to):
+            terms.append((d_from, d_from[target], d_to, d_to[target]))
+
+        def heuristic(v):
+            best = 0
+            for d_from, from_t, d_to, to_t in terms:
+                lv = d_from[v]
+                if lv != INF and from_t != INF and from_t - lv > best:
+                    best = from_t - lv
+                vl = d_to[v]
+                if vl != INF and to_t != INF and vl - to_t > best:
+                    best = vl - to_t
+            return best
+
+        return heuristic
+
+    def save(self, filename):
+        data = {
+            "format": LANDMARK_FORMAT,
+            "fingerprint": self.fingerprint,
+            "landmarks": self.landmarks,
+            "from": [a.tobytes() for a in self.dist_from],
+            "to": [a.tobytes() for a in self.dist_to],
+        }
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """Load a saved table, or return None if missing or built for another graph."""
+        try:
+            with open(filename, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if data.get("format") != LANDMARK_FORMAT or data.get("fingerprint") != graph.fingerprint():
+            return None
+
+        def unpack(raw):
+            a = array("d")
+            a.frombytes(raw)
+            return a
+
+        return cls(data["fingerprint"], data["landmarks"],
+                   [unpack(raw) for raw in data["from"]],
+                   [unpack(raw) for raw in data["to"]])
@@ -1,4 +1,8 @@
 # linked_history.py
+from itertools import chain, islice
+
+from text_index import TextIndex
+
 class Node:
     def __init__(self, data):
         self.data = data
@@ -55,3 +59,166 @@ class LinkedHistory:
             while current:
                 f.write(current.data + "\n")
                 current = current.next
+
+
+class HistoryView:
+    """Read-only window onto a RingHistory; indexes into it instead of copying.
+
+    A view follows its history by position, so later adds and evictions
+    show through.
+    """
+
+    __slots__ = ("_history", "_range")
+
+    def __init__(self, history, positions):
+        self._history = history
+        self._range = positions
+
+    def __len__(self):
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryView(self._history, self._range[index])
+        return self._history[self._range[index]]
+
+    def __iter__(self):
+        history = self._history
+        for i in self._range:
+            yield history[i]
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+
+class RingHistory:
+    """History entries in a fixed-capacity ring buffer, oldest first.
+
+    Adding to a full buffer overwrites the oldest entry, so add and
+    eviction are O(1); indexing is O(1) from either end. Without
+    max_entries the buffer doubles whenever it fills up.
+    """
+
+    __slots__ = ("max_entries", "_items", "_start", "_size")
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._items = [None] * (max_entries or 16)
+        self._start = 0
+        self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return self._size
+
+    def add(self, item):
+        """Add new history entry at the end; returns the entry it evicted, if any."""
+        capacity = len(self._items)
+        if self._size == capacity and not self.max_entries:
+            self._grow()
+            capacity = len(self._items)
+        if self._size < capacity:
+            self._items[(self._start + self._size) % capacity] = item
+            self._size += 1
+            return None
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % capacity
+        return evicted
+
+    def _grow(self):
+        items = self._items[self._start:] + self._items[:self._start]
+        self._items = items + [None] * len(items)
+        self._start = 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryView(self, range(self._size)[index])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        return self._items[(self._start + index) % len(self._items)]
+
+    def _segments(self):
+        """The one or two (lo, hi) slot ranges holding the entries, oldest first."""
+        capacity = len(self._items)
+        end = self._start + self._size
+        if end <= capacity:
+            return (self._start, end), (0, 0)
+        return (self._start, capacity), (0, end - capacity)
+
+    def __iter__(self):
+        (lo, hi), (lo2, hi2) = self._segments()
+        return chain(islice(self._items, lo, hi), islice(self._items, lo2, hi2))
+
+    def __reversed__(self):
+        (lo, hi), (lo2, hi2) = self._segments()
+        n = len(self._items)
+        return chain(islice(reversed(self._items), n - hi2, n - lo2),
+                     islice(reversed(self._items), n - hi, n - lo))
+
+    def view(self, start=None, stop=None):
+        """Entries start..stop (oldest = 0) without copying them."""
+        return self[start:stop]
+
+    def get_all(self):
+        """Return all history entries as a list."""
+        (lo, hi), (lo2, hi2) = self._segments()
+        result = self._items[lo:hi]
+        result += self._items[lo2:hi2]
+        return result
+
+    def clear(self):
+        self._items = [None] * (self.max_entries or 16)
+        self._start = self._size = 0
+
+    def search(self, keyword):
+        keyword = keyword.lower()
+        return [item for item in self if keyword in item.lower()]
+
+    def export_to_file(self, filename):
+        with open(filename, "w") as f:
+            for item in self:
+                f.write(item + "\n")
+
+
+class IndexedHistory(RingHistory):
+    """RingHistory whose search goes through an inverted index.
+
+    Every entry gets a sequence number; the index is updated on add and
+    eviction, so a search only touches the postings of the query's words
+    or trigrams instead of lowercasing every entry.
+    """
+
+    __slots__ = ("index", "_next_id")
+
+    def __init__(self, max_entries=None):
+        super().__init__(max_entries)
+        self._next_id = 0
+        self.index = TextIndex(self._entry)
+
+    def _entry(self, doc_id):
+        return self[doc_id - (self._next_id - self._size)]
+
+    def add(self, item):
+        evicted = super().add(item)
+        self.index.add(self._next_id, item)
+        self._next_id += 1
+        self.index.evict_before(self._next_id - self._size)
+        return evicted
+
+    def clear(self):
+        super().clear()
+        self.index.clear()
+
+    def search(self, keyword, mode="substring"):
+        """Entries matching keyword, oldest first.
+
+        mode is "substring" (same results as RingHistory.search), "word"
+        or "prefix"; see TextIndex.search.
+        """
+        return [self._entry(doc_id) for doc_id in self.index.search(keyword, mode)]
@@ -0,0 +1,250 @@
+# history_log.py
+import json
+import os
+import shutil
+import time
+
+# Next to this module, so the history is the same whatever the working directory
+HISTORY_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.log")
+# The active file is rotated to .1, .2, ... once it reaches this size
+MAX_LOG_BYTES = 4 * 1024 * 1024
+BACKUP_COUNT = 8
+# Rotation compacts the log to its newest MAX_LOG_RECORDS records once the
+# segments hold COMPACT_RATIO times as many
+MAX_LOG_RECORDS = 200_000
+COMPACT_RATIO = 1.5
+# fsync after this many appends or this many seconds, whichever comes first
+SYNC_EVERY = 64
+SYNC_INTERVAL = 2.0
+# Bytes read per step when reading the log backwards from its end
+TAIL_BLOCK = 64 * 1024
+EXPORT_CHUNK = 4096
+
+
+def _encode(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _decode(line):
+    """The record on line, or None for a record torn by a crash."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _reverse_lines(filename, block=TAIL_BLOCK):
+    """Yield the non-empty lines of filename last first, reading block bytes at a time."""
+    with open(filename, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            # the first piece may continue in the block before this one
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if rest:
+            yield rest
+
+
+def _line_start(filename, n, block=TAIL_BLOCK):
+    """(offset, count): where the last n lines of filename begin, reading
+    backwards from the end; (0, number of lines) if it has no more than n."""
+    with open(filename, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        newlines = 0
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step)
+            end = step
+            while True:
+                # the newline ending the line before the n-th last one
+                end = data.rfind(b"\n", 0, end)
+                if end < 0:
+                    break
+                newlines += 1
+                if newlines == n + 1:
+                    return pos + end + 1, n
+    return 0, newlines
+
+
+def _line_count(filename, block=TAIL_BLOCK):
+    with open(filename, "rb") as f:
+        return sum(data.count(b"\n") for data in iter(lambda: f.read(block), b""))
+
+
+class HistoryLog:
+    """Append-only log of history records, one JSON document per line.
+
+    Appends are buffered and fsync'ed in batches (every sync_every records
+    or sync_interval seconds, and on close), so a crash loses at most the
+    last batch. The active file rotates to filename.1 (older segments
+    shift to .2, .3, ...) when it reaches max_bytes; segments beyond
+    backup_count are deleted. With max_records, a rotation that leaves
+    more than compact_ratio times that many records in the segments
+    compacts the log down to the newest max_records.
+    """
+
+    def __init__(self, filename=HISTORY_LOG_FILE, max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT,
+                 sync_every=SYNC_EVERY, sync_interval=SYNC_INTERVAL, max_records=MAX_LOG_RECORDS,
+                 compact_ratio=COMPACT_RATIO):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.max_records = max_records
+        self.compact_ratio = compact_ratio
+        # Records per rotated segment, newest (.1) first; counted on first rotation
+        self._backup_records = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        self._open()
+
+    def _open(self):
+        self._file = open(self.filename, "ab")
+        if self._file.tell():
+            with open(self.filename, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            if torn:
+                # Start the next record on a fresh line after a crash mid-write
+                self._file.write(b"\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, record):
+        """Append a JSON-serializable record."""
+        self._file.write(_encode(record))
+        self._pending += 1
+        if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        if self._file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def sync(self):
+        """Write buffered records through to disk."""
+        self._file.flush()
+        if self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _segment(self, n):
+        return f"{self.filename}.{n}" if n else self.filename
+
+    def segments(self):
+        """Existing log files, oldest first; the active file is last."""
+        names = [self._segment(n) for n in range(self.backup_count, 0, -1)]
+        return [name for name in names if os.path.exists(name)] + [self.filename]
+
+    def rotate(self):
+        self.close()
+        if self._backup_records is None:
+            self._backup_records = [_line_count(name) for name in reversed(self.segments()[:-1])]
+        self._backup_records.insert(0, _line_count(self.filename))
+        if self.backup_count:
+            for n in range(self.backup_count - 1, -1, -1):
+                if os.path.exists(self._segment(n)):
+                    os.replace(self._segment(n), self._segment(n + 1))
+        else:
+            os.remove(self.filename)
+        del self._backup_records[self.backup_count:]
+        self._open()
+        if self.max_records and sum(self._backup_records) > self.compact_ratio * self.max_records:
+            self.compact(self.max_records)
+
+    def tail(self, n):
+        """The last n records, oldest first, read backwards from the end of the log."""
+        self._file.flush()
+        records = []
+        if n <= 0:
+            return records
+        for name in reversed(self.segments()):
+            for line in _reverse_lines(name):
+                record = _decode(line)
+                if record is None:
+                    continue
+                records.append(record)
+                if len(records) == n:
+                    return records[::-1]
+        return records[::-1]
+
+    def chunks(self, size=EXPORT_CHUNK):
+        """Yield every record, oldest first, in lists of at most size records."""
+        self._file.flush()
+        chunk = []
+        for name in self.segments():
+            with open(name, "rb") as f:
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        continue
+                    chunk.append(record)
+                    if len(chunk) == size:
+                        yield chunk
+                        chunk = []
+        if chunk:
+            yield chunk
+
+    def export(self, filename, formatter=str, chunk_size=EXPORT_CHUNK):
+        """Write every record as a line of text to filename; returns the record count.
+
+        Records are streamed a chunk at a time, so memory use does not grow
+        with the length of the log.
+        """
+        count = 0
+        with open(filename, "w", encoding="utf-8") as f:
+            for chunk in self.chunks(chunk_size):
+                f.writelines(formatter(record) + "\n" for record in chunk)
+                count += len(chunk)
+        return count
+
+    def compact(self, keep):
+        """Rewrite the log as a single file holding only the last keep records.
+
+        The kept lines are copied as they are, without being decoded.
+        """
+        self.close()
+        segments = self.segments()
+        # Find the segment and offset where the last keep lines begin
+        first, offset = 0, 0
+        for first in range(len(segments) - 1, -1, -1):
+            offset, found = _line_start(segments[first], keep)
+            keep -= found
+            if not keep:
+                break
+        tmp = self.filename + ".tmp"
+        with open(tmp, "wb") as out:
+            for i, name in enumerate(segments[first:]):
+                with open(name, "rb") as f:
+                    f.seek(0 if i else offset)
+                    shutil.copyfileobj(f, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.filename)
+        for name in segments[:-1]:
+            os.remove(name)
+        self._backup_records = []
+        self._open()
+
+    def clear(self):
+        self.compact(0)
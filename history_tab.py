@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from constants import *
+from route_history import parse_entry
 
 
 class HistoryTab:
@@ -137,16 +138,14 @@ class HistoryTab:
             return
         
         
-        if "Navigation: " in item and " → " in item:
-            try:
-                parts = item.split("Navigation: ")[1].split(" → ")
-                start = parts[0].strip()
-                end = parts[1].split(" (")[0].strip()
-                
-                # Set the values in navigation tab
-                self.app.navigation_tab.start_var.set(start)
-                self.app.navigation_tab.end_var.set(end)
-                self.app.notebook.select(0)  # Switch to navigation tab
-                self.app.update_status(f"Loaded route: {start} to {end}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to parse history item: {str(e)}")
\ No newline at end of file
+        route = parse_entry(item)
+        if route is None:
+            messagebox.showwarning("Warning", "Selected item is not a route")
+            return
+        start, end = route
+
+        # Set the values in navigation tab
+        self.app.navigation_tab.start_var.set(start)
+        self.app.navigation_tab.end_var.set(end)
+        self.app.notebook.select(0)  # Switch to navigation tab
+        self.app.update_status(f"Loaded route: {start} to {end}")
\ No newline at end of file
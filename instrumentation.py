@@ -0,0 +1,236 @@
+# instrumentation.py
+"""Optional counters and profiling for Navigation queries.
+
+Off by default; Navigation only pays for it after enable_instrumentation().
+
+    python instrumentation.py --queries 500 --method alt --profile 50
+
+runs random queries and prints the summary (and a cProfile report of the
+first 50 queries).
+"""
+import argparse
+import cProfile
+import io
+import math
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """Request latencies in power-of-two millisecond buckets."""
+
+    def __init__(self, buckets=24):
+        # bucket i counts latencies below 2 ** (i - 6) ms (~16 us .. ~2 min)
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms):
+        i = 0 if ms <= 0 else min(len(self.counts) - 1, max(0, math.ceil(math.log2(ms)) + 6))
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, in ms."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(2.0 ** (i - 6), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+        }
+
+
+class QueryStats:
+    """Per-query counters, latency histograms and an opt-in profiler.
+
+    Counters accumulate over the whole session; the rolling window keeps
+    exact latencies of the last `window` queries so percentiles follow
+    current behaviour. Set `trace` to a callable to receive one dict per
+    query.
+    """
+
+    COUNTERS = ("queries", "cache_hits", "settled", "pushes", "pops", "stale")
+
+    def __init__(self, window=1000):
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.by_method = {}
+        self.latency = LatencyHistogram()
+        self.recent = deque(maxlen=window)
+        self.trace = None
+        # Text report of the last finished profiling run
+        self.last_profile = None
+        self._profiler = None
+        self._profile_left = 0
+        self._profile_file = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self.by_method = {}
+            self.recent.clear()
+        self.latency = LatencyHistogram()
+
+    def profile(self, queries, filename=None):
+        """Run cProfile over the next `queries` queries.
+
+        The report ends up in self.last_profile; with filename the raw
+        pstats data is written there as well.
+        """
+        if queries <= 0:
+            raise ValueError("queries must be positive")
+        self._profiler = cProfile.Profile()
+        self._profile_left = queries
+        self._profile_file = filename
+
+    @contextmanager
+    def query(self, nav, method):
+        """Measure one nav query; yields the heap counters dict for the search."""
+        counters = {"pushes": 0, "pops": 0, "stale": 0}
+        hits = nav.tree_cache.hits
+        profiler = self._profiler
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield counters
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        ms = (time.perf_counter() - started) * 1000
+        self.record(method, ms, nav.last_settled, counters, nav.tree_cache.hits > hits)
+        if profiler is not None:
+            self._profiled(profiler)
+
+    def record(self, method, ms, settled, counters, cache_hit):
+        with self._lock:
+            totals = self.counters
+            totals["queries"] += 1
+            totals["cache_hits"] += cache_hit
+            totals["settled"] += settled
+            for key, value in counters.items():
+                totals[key] += value
+            self.by_method[method] = self.by_method.get(method, 0) + 1
+            self.recent.append(ms)
+        self.latency.record(ms)
+        if self.trace is not None:
+            self.trace({"method": method, "ms": ms, "settled": settled,
+                        "cache_hit": cache_hit, **counters})
+
+    def _profiled(self, profiler):
+        self._profile_left -= 1
+        if self._profile_left > 0 or profiler is not self._profiler:
+            return
+        self._profiler = None
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+        self.last_profile = stream.getvalue()
+        if self._profile_file:
+            profiler.dump_stats(self._profile_file)
+
+    def recent_percentile(self, p):
+        """Exact p-th percentile over the rolling window, in ms."""
+        window = sorted(self.recent)
+        if not window:
+            return 0.0
+        return window[min(len(window) - 1, round(p / 100 * (len(window) - 1)))]
+
+    def summary(self):
+        totals = dict(self.counters)
+        queries = totals["queries"] or 1
+        return {
+            "counters": totals,
+            "by_method": dict(self.by_method),
+            "cache_hit_rate": totals["cache_hits"] / queries,
+            "settled_per_query": totals["settled"] / queries,
+            "stale_per_pop": totals["stale"] / (totals["pops"] or 1),
+            "latency": self.latency.summary(),
+            "recent": {
+                "window": len(self.recent),
+                "p50_ms": self.recent_percentile(50),
+                "p95_ms": self.recent_percentile(95),
+                "p99_ms": self.recent_percentile(99),
+            },
+        }
+
+    def status_line(self):
+        """One-line summary for a status bar."""
+        s = self.summary()
+        if not s["counters"]["queries"]:
+            return "No routing queries yet"
+        recent = s["recent"]
+        return (f"{s['counters']['queries']} queries | p50 {recent['p50_ms']:.2f} ms, "
+                f"p95 {recent['p95_ms']:.2f} ms | {s['cache_hit_rate']:.0%} cache hits | "
+                f"{s['settled_per_query']:.0f} nodes/query")
+
+    def report(self):
+        """Multi-line summary for the command line."""
+        s = self.summary()
+        totals, latency, recent = s["counters"], s["latency"], s["recent"]
+        lines = [
+            f"queries          {totals['queries']}  "
+            + " ".join(f"{m}={n}" for m, n in sorted(s["by_method"].items())),
+            f"cache hits       {totals['cache_hits']} ({s['cache_hit_rate']:.1%})",
+            f"nodes settled    {totals['settled']} ({s['settled_per_query']:.1f}/query)",
+            f"heap push/pop    {totals['pushes']} / {totals['pops']}",
+            f"stale skips      {totals['stale']} ({s['stale_per_pop']:.1%} of pops)",
+            f"latency (all)    mean {latency['mean_ms']:.3f} ms, p50 <= {latency['p50_ms']:g} ms, "
+            f"p95 <= {latency['p95_ms']:g} ms, max {latency['max_ms']:.3f} ms",
+            f"latency (last {recent['window']}) p50 {recent['p50_ms']:.3f} ms, "
+            f"p95 {recent['p95_ms']:.3f} ms, p99 {recent['p99_ms']:.3f} ms",
+        ]
+        if self.last_profile:
+            lines += ["", self.last_profile]
+        return "\n".join(lines)
+
+
+def main():
+    from navigation import Navigation
+
+    parser = argparse.ArgumentParser(description="Run random routing queries and dump statistics")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--method", default="dijkstra")
+    parser.add_argument("--edges", type=int, help="use a synthetic grid campus of about this many edges")
+    parser.add_argument("--profile", type=int, default=0, help="cProfile the first N queries")
+    parser.add_argument("--profile-file", help="also write the raw pstats data here")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    nav = Navigation()
+    if args.edges:
+        from benchmarks.generators import campus_with_edges
+        nav.graph, nav.coordinates = campus_with_edges("grid", args.edges, args.seed)
+    stats = nav.enable_instrumentation()
+    if args.profile:
+        stats.profile(args.profile, args.profile_file)
+    rng = random.Random(args.seed)
+    names = list(nav.graph)
+    for _ in range(args.queries):
+        nav.shortest_path(rng.choice(names), rng.choice(names), method=args.method)
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
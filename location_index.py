@@ -0,0 +1,189 @@
+# location_index.py
+import heapq
+import math
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+# Candidates examined, best first, when matching query words in any order;
+# the first word-order match is usually found long before this
+PREFIX_SCAN_LIMIT = 2000
+# Trigrams shared by more labels than this are too common to find fuzzy
+# candidates with; rarer trigrams of the query pick the candidates
+FUZZY_POSTINGS_LIMIT = 500
+# Queries up to this long match so many labels that their results are
+# memoized (there are only a few thousand of them)
+MEMO_QUERY_LENGTH = 2
+
+
+def normalize(text):
+    """Lower-case text and collapse punctuation and whitespace to single spaces."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.casefold()).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    """Autocomplete over location names and aliases.
+
+    A sorted array of normalized labels and each of their word suffixes
+    (so "fac" finds "Engineering Faculty") answers prefix queries with a
+    binary search. A sparse table of each row's position in result order
+    then pulls the best rows of that range out one at a time, so a query
+    costs O(k log n) however many names share the prefix. A trigram index
+    catches typos when nothing matches as typed.
+    """
+
+    def __init__(self, names, aliases=None, min_similarity=0.4):
+        self.names = list(names)
+        self.min_similarity = min_similarity
+        ids = {name: i for i, name in enumerate(self.names)}
+        labels = [(name, i) for i, name in enumerate(self.names)]
+        for alias, name in (aliases or {}).items():
+            if name not in ids:
+                raise ValueError(f"Alias {alias!r} points to unknown location {name!r}")
+            labels.append((alias, ids[name]))
+
+        entries = []
+        postings = {}
+        # Per label: "  word word " (padded like trigrams), trigram count and location id
+        self._label_text = []
+        self._label_grams = []
+        self._label_ids = []
+        for label, i in labels:
+            words = normalize(label).split()
+            if not words:
+                continue
+            n = len(self._label_ids)
+            for j in range(len(words)):
+                # rank 0 for the start of the label, 1 for a later word
+                entries.append((" ".join(words[j:]), min(j, 1), len(label), n))
+            grams = trigrams(" ".join(words))
+            for gram in grams:
+                postings.setdefault(gram, []).append(n)
+            self._label_text.append(f"  {' '.join(words)} ")
+            self._label_grams.append(len(grams))
+            self._label_ids.append(i)
+        entries.sort()
+        self._keys = [entry[0] for entry in entries]
+        self._rows = [entry[3] for entry in entries]
+        # Result order of every row: rank, then label length, then name
+        names, label_ids = self.names, self._label_ids
+        order = sorted(range(len(entries)), key=lambda pos: (
+            entries[pos][1], entries[pos][2], names[label_ids[entries[pos][3]]]))
+        self._order = order
+        score = np.empty(len(entries), np.int32)
+        score[order] = np.arange(len(entries), dtype=np.int32)
+        # _levels[j][i] is the best score among rows i .. i + 2**j - 1
+        self._levels = [score]
+        width = 1
+        while 2 * width <= len(entries):
+            below = self._levels[-1]
+            self._levels.append(np.minimum(below[:-width], below[width:]))
+            width *= 2
+        self._postings = postings
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, k=10):
+        """Return up to k location names matching query, best first.
+
+        Names starting with the query come first, then names with a word
+        starting with it (shorter names first within each group), then names
+        whose words start with each query word in any order. Only when none
+        of those match are fuzzy trigram matches returned, by similarity.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+        if len(q) <= MEMO_QUERY_LENGTH:
+            key = (q, k)
+            if key not in self._memo:
+                self._memo[key] = self._search(q, k)
+            return list(self._memo[key])
+        return self._search(q, k)
+
+    def _search(self, q, k):
+        ranked = []
+        seen = set()
+        for label in self._prefix_range(q):
+            i = self._label_ids[label]
+            if i not in seen:
+                seen.add(i)
+                ranked.append(i)
+                if len(ranked) == k:
+                    return [self.names[i] for i in ranked]
+
+        words = q.split()
+        if len(words) > 1:
+            # candidates come from the query word with the fewest matches
+            rarest = min(words, key=self._prefix_count)
+            patterns = [" " + word for word in words]
+            texts = self._label_text
+            for n, label in enumerate(self._prefix_range(rarest)):
+                if n == PREFIX_SCAN_LIMIT or len(ranked) == k:
+                    break
+                i = self._label_ids[label]
+                if i not in seen and all(p in texts[label] for p in patterns):
+                    seen.add(i)
+                    ranked.append(i)
+
+        # Fuzzy matching is the slow path; only fall back to it when
+        # nothing matched as typed
+        if not ranked and len(q) >= 3:
+            ranked = self._fuzzy(q)[:k]
+        return [self.names[i] for i in ranked]
+
+    def _best(self, lo, hi):
+        """Score of the best row in lo..hi - 1."""
+        j = (hi - lo).bit_length() - 1
+        level = self._levels[j]
+        return int(min(level[lo], level[hi - (1 << j)]))
+
+    def _prefix_range(self, prefix):
+        """Yield the labels of rows starting with prefix, best first."""
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff")
+        if lo == hi:
+            return
+        heap = [(self._best(lo, hi), lo, hi)]
+        while heap:
+            score, lo, hi = heapq.heappop(heap)
+            pos = self._order[score]
+            yield self._rows[pos]
+            # the rest of the range is the parts on either side of pos
+            if lo < pos:
+                heapq.heappush(heap, (self._best(lo, pos), lo, pos))
+            if pos + 1 < hi:
+                heapq.heappush(heap, (self._best(pos + 1, hi), pos + 1, hi))
+
+    def _prefix_count(self, prefix):
+        return bisect_left(self._keys, prefix + "\uffff") - bisect_left(self._keys, prefix)
+
+    def _fuzzy(self, q):
+        grams = trigrams(q)
+        # Dice >= m needs at least m * len(grams) / (2 - m) shared trigrams,
+        # so every match shares one of the len(grams) - need + 1 rarest
+        m = self.min_similarity
+        need = max(math.ceil(m * len(grams) / (2 - m)), 1)
+        lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for postings in lists[:len(grams) - need + 1]:
+            if len(postings) > FUZZY_POSTINGS_LIMIT:
+                break
+            candidates.update(postings)
+        scores = {}
+        for label in candidates:
+            text = self._label_text[label]
+            shared = sum(gram in text for gram in grams)
+            similarity = 2 * shared / (len(grams) + self._label_grams[label])
+            i = self._label_ids[label]
+            if similarity >= m and similarity > scores.get(i, 0):
+                scores[i] = similarity
+        return sorted(scores, key=lambda i: (-scores[i], self.names[i]))
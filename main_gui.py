@@ -2,63 +2,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from navigation import Navigation
-from map_visualization import draw_campus
+from history import IndexedHistory
+from history_log import HistoryLog
+from route_history import RouteHistory, format_entry, parse_entry, record_entry
+from map_canvas import MapView
+from virtual_list import VirtualList
+from route_worker import RouteWorker
+from routing_graph import SearchCancelled
 import calendar
+import time
 from datetime import datetime
 
-# ---------------- Linked List for History/Events ----------------
-class Node:
-    def __init__(self, data):
-        self.data = data
-        self.next = None
-
-class LinkedHistory:
-    def __init__(self, max_entries=None):
-        self.head = None
-        self.tail = None
-        self.max_entries = max_entries
-        self.size = 0
-
-    def add(self, item):
-        new_node = Node(item)
-        if not self.head:
-            self.head = self.tail = new_node
-        else:
-            self.tail.next = new_node
-            self.tail = new_node
-        self.size += 1
-        if self.max_entries and self.size > self.max_entries:
-            self.head = self.head.next
-            self.size -= 1
-
-    def get_all(self):
-        result = []
-        current = self.head
-        while current:
-            result.append(current.data)
-            current = current.next
-        return result
-
-    def clear(self):
-        self.head = self.tail = None
-        self.size = 0
-
-    def search(self, keyword):
-        result = []
-        current = self.head
-        while current:
-            if keyword.lower() in current.data.lower():
-                result.append(current.data)
-            current = current.next
-        return result
-
-    def export_to_file(self, filename):
-        with open(filename, "w") as f:
-            current = self.head
-            while current:
-                f.write(current.data + "\n")
-                current = current.next
-
 # ---------------- Resource Management ----------------
 university_structure = {
     "Faculty of Computing": {
@@ -120,12 +74,32 @@ class UniversityApp:
         self.root.geometry("1000x700")
         self.root.configure(bg="#F5F5F5")
 
+        self.status_var = tk.StringVar(value="Ready")
+        status_bar = tk.Label(root, textvariable=self.status_var, anchor="w", font=("Segoe UI", 10),
+                              bg="#E0E0E0", fg="#333333", padx=10)
+        status_bar.pack(side="bottom", fill="x")
+        # Double-click the status bar for the full routing statistics
+        status_bar.bind("<Double-Button-1>", lambda event: self.show_query_stats())
+
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill="both", expand=True)
 
         self.nav = Navigation()
-        self.history = LinkedHistory(max_entries=100)
-        self.events = LinkedHistory(max_entries=100)
+        self.nav.enable_instrumentation()
+        # Routing runs off the Tk thread so the window stays responsive
+        self.router = RouteWorker(root, on_progress=self.show_route_progress)
+        self.history = IndexedHistory(max_entries=100)
+        self.events = IndexedHistory(max_entries=100)
+        # History survives restarts; only the records analytics keeps in
+        # memory are read back
+        self.route_history = RouteHistory()
+        self.history_log = HistoryLog()
+        for record in self.history_log.tail(self.route_history.max_entries):
+            if isinstance(record, dict):
+                self.route_history.add_record(record)
+        for item in self.route_history.entries(-self.history.max_entries):
+            self.history.add(item)
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # ---------------- Sample Events ----------------
         sample_events = [
@@ -155,10 +129,22 @@ class UniversityApp:
         )
 
         self.create_navigation_tab()
+        self.create_map_tab()
         self.create_resources_tab()
         self.create_history_tab()
         self.create_event_tab()
         self.refresh_event_tab()
+        self.warm_up_routes()
+
+    def update_status(self, message):
+        self.status_var.set(message)
+
+    def on_close(self):
+        self.history_log.close()
+        self.root.destroy()
+
+    def show_query_stats(self):
+        messagebox.showinfo("Routing Statistics", self.nav.query_stats.report())
 
     # ---------------- Navigation Tab ----------------
     def create_navigation_tab(self):
@@ -169,38 +155,105 @@ class UniversityApp:
         self.start_var = tk.StringVar()
         self.start_cb = ttk.Combobox(nav_frame, textvariable=self.start_var, values=list(self.nav.graph.keys()))
         self.start_cb.pack(pady=5)
+        self.start_cb.bind("<KeyRelease>", self.filter_locations)
         tk.Label(nav_frame, text="Select Destination:", font=("Segoe UI", 12), bg="#F5F5F5").pack(pady=5)
         self.end_var = tk.StringVar()
         self.end_cb = ttk.Combobox(nav_frame, textvariable=self.end_var, values=list(self.nav.graph.keys()))
         self.end_cb.pack(pady=5)
+        self.end_cb.bind("<KeyRelease>", self.filter_locations)
         btns = tk.Frame(nav_frame, bg="#F5F5F5")
         btns.pack(pady=10)
         ttk.Button(btns, text="Find Path", style="Rounded.TButton", command=self.find_path).grid(row=0, column=0, padx=5)
         ttk.Button(btns, text="Show Map", style="Rounded.TButton", command=self.show_map_only).grid(row=0, column=1, padx=5)
         ttk.Button(btns, text="Show Path", style="Rounded.TButton", command=self.show_map_with_path).grid(row=0, column=2, padx=5)
+        ttk.Button(btns, text="Reachable", style="Rounded.TButton", command=self.show_reachable).grid(row=0, column=3, padx=5)
         self.nav_result = tk.Text(nav_frame, height=8, width=70, wrap="word",
                                   bg="#FFFFFF", fg="#333333", font=("Segoe UI", 11), relief="solid", bd=1)
         self.nav_result.pack(pady=10)
 
+    def filter_locations(self, event):
+        """Narrow a location combobox to the best completions of what is typed."""
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        combobox = event.widget
+        text = combobox.get()
+        if text.strip():
+            combobox["values"] = self.nav.search_locations(text, k=20)
+        else:
+            combobox["values"] = list(self.nav.graph.keys())
+
     def find_path(self):
         start, end = self.start_var.get(), self.end_var.get()
         if not start or not end:
             messagebox.showerror("Error", "Please select both start and destination.")
             return
-        path, dist = self.nav.shortest_path(start, end)
+        # A newer click cancels a search that is still running
+        self.update_status(f"Computing route {start} -> {end}...")
+        self.router.submit(self.compute_route, start, end,
+                           on_done=self.show_route, on_error=self.show_route_error)
+
+    def compute_route(self, start, end, cancel=None):
+        """Runs on the routing thread; must not touch any widgets."""
+        started = time.perf_counter()
+        path, dist = self.nav.shortest_path(start, end, cancel=cancel)
+        seconds = time.perf_counter() - started
+        routes = []
+        if path:
+            if cancel is not None and cancel.is_set():
+                raise SearchCancelled()
+            # Offer a few alternatives that don't mostly repeat the main route
+            routes = self.nav.alternative_routes(start, end, k=4, time_budget_ms=100, max_overlap=0.7,
+                                                 cancel=cancel)
+        return start, end, path, dist, routes, seconds
+
+    def show_route_progress(self, elapsed):
+        dots = "." * (int(elapsed * 4) % 4)
+        self.update_status(f"Computing route{dots} ({elapsed:.1f} s)")
+
+    def show_route_error(self, error):
+        self.update_status("Routing failed")
+        messagebox.showerror("Error", f"Failed to compute route: {error}")
+
+    def show_route(self, route):
+        start, end, path, dist, routes, seconds = route
         if path:
             result = f"Shortest Path from {start} to {end}:\n{' -> '.join(path)}\nDistance: {dist} meters"
+            self.last_alternatives = [alt for alt, _ in routes[1:]]
+            for i, (alt, alt_dist) in enumerate(routes[1:], 1):
+                result += f"\nAlternative {i}: {' -> '.join(alt)} ({alt_dist} meters)"
             self.nav_result.delete("1.0", tk.END)
             self.nav_result.insert(tk.END, result)
             self.last_path = path
-            self.history.add(f"Path {start} -> {end}")
-            self.refresh_history_tab()
+            self.route_history.add(start, end, dist, seconds)
+            self.history_log.append(self.route_history.to_record(-1))
+            evicted = self.history.add(format_entry(start, end))
+            # Search results stay on screen until Refresh
+            if self.history_list.source is self.history:
+                self.history_list.appended(1 if evicted is not None else 0)
+            self.update_status(f"Route found: {dist} meters | {self.nav.query_stats.status_line()}")
         else:
+            self.update_status("No route found")
             messagebox.showerror("Error", "Invalid path selected.")
 
+    # ---------------- Map Tab ----------------
+    def create_map_tab(self):
+        self.map_frame = tk.Frame(self.notebook, bg="#F5F5F5")
+        self.notebook.add(self.map_frame, text="Map")
+        self.map_view = MapView(self.map_frame, bg="#F5F5F5")
+        self.map_view.pack(fill="both", expand=True)
+
+    def open_map(self):
+        """Bring up the Map tab with the current graph and closures drawn."""
+        # The base map is only re-rendered when the graph itself changed
+        self.map_view.set_graph(self.nav.compiled(), key=self.nav.version, positions=self.nav.coordinates)
+        self.map_view.show_closures(list(self.nav.closed))
+        self.notebook.select(self.map_frame)
+
     def show_map_only(self):
         try:
-            draw_campus(self.nav.graph)
+            self.open_map()
+            self.map_view.clear_overlay("route")
+            self.map_view.clear_overlay("isochrone")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to draw map: {e}")
 
@@ -210,7 +263,23 @@ class UniversityApp:
             messagebox.showinfo("Info", "Find a path first.")
             return
         try:
-            draw_campus(self.nav.graph, path=path)
+            self.open_map()
+            self.map_view.show_route(path, getattr(self, "last_alternatives", None))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to draw map: {e}")
+
+    def show_reachable(self):
+        start = self.start_var.get()
+        if start not in self.nav.graph:
+            messagebox.showinfo("Info", "Select a start location first.")
+            return
+        meters = simpledialog.askinteger("Reachable Area", "Walking distance (meters):", initialvalue=300, minvalue=1)
+        if not meters:
+            return
+        reachable = self.nav.reachable_within(start, max_distance=meters)
+        try:
+            self.open_map()
+            self.map_view.show_isochrone(reachable)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to draw map: {e}")
 
@@ -228,39 +297,75 @@ class UniversityApp:
     def create_history_tab(self):
         hist_frame = tk.Frame(self.notebook, bg="#F5F5F5")
         self.notebook.add(hist_frame, text="History")
-        self.history_box = tk.Listbox(hist_frame, height=20, width=70,
-                                      font=("Segoe UI", 11), bg="#FFFFFF", fg="#333333", bd=1, relief="solid")
-        self.history_box.pack(padx=10, pady=10)
+        # Only the visible rows live in the listbox, however long the history
+        self.history_list = VirtualList(hist_frame, self.history, rows=20, width=70,
+                                        font=("Segoe UI", 11), bg="#FFFFFF", fg="#333333", bd=1, relief="solid")
+        self.history_list.pack(padx=10, pady=10)
         btn_frame = tk.Frame(hist_frame, bg="#F5F5F5")
         btn_frame.pack(pady=5)
         ttk.Button(btn_frame, text="Refresh", style="Rounded.TButton", command=self.refresh_history_tab).grid(row=0, column=0, padx=5)
         ttk.Button(btn_frame, text="Clear All", style="Rounded.TButton", command=self.clear_history_tab).grid(row=0, column=1, padx=5)
         ttk.Button(btn_frame, text="Search", style="Rounded.TButton", command=self.search_history_tab).grid(row=0, column=2, padx=5)
         ttk.Button(btn_frame, text="Export", style="Rounded.TButton", command=self.export_history_tab).grid(row=0, column=3, padx=5)
+        ttk.Button(btn_frame, text="Reuse", style="Rounded.TButton", command=self.reuse_history_item).grid(row=0, column=4, padx=5)
+        ttk.Button(btn_frame, text="Insights", style="Rounded.TButton", command=self.show_route_insights).grid(row=0, column=5, padx=5)
 
     def refresh_history_tab(self):
-        self.history_box.delete(0, tk.END)
-        for item in self.history.get_all():
-            self.history_box.insert(tk.END, item)
+        self.history_list.set_source(self.history)
 
     def clear_history_tab(self):
         if messagebox.askyesno("Confirm", "Clear all history?"):
             self.history.clear()
+            self.route_history.clear()
+            self.history_log.clear()
             self.refresh_history_tab()
 
     def search_history_tab(self):
         keyword = simpledialog.askstring("Search History", "Enter keyword:")
         if keyword:
             results = self.history.search(keyword)
-            self.history_box.delete(0, tk.END)
-            for item in results:
-                self.history_box.insert(tk.END, item)
+            self.history_list.set_source(results, follow=False)
+            self.update_status(f"{len(results)} of {len(self.history)} history entries match "
+                               f"'{keyword}' (index: {self.history.index.nbytes() / 1024:.0f} KB)")
+
+    def reuse_history_item(self):
+        item = self.history_list.selected()
+        route = parse_entry(item) if item is not None else None
+        if route is None:
+            messagebox.showwarning("Warning", "Please select a route first")
+            return
+        start, end = route
+        self.start_var.set(start)
+        self.end_var.set(end)
+        self.notebook.select(0)
+        self.update_status(f"Loaded route: {start} to {end}")
+
+    def show_route_insights(self):
+        routes = self.route_history
+        if not len(routes):
+            messagebox.showinfo("Route Insights", "No routes recorded yet.")
+            return
+        lines = [f"{len(routes)} routes recorded", "", "Most frequent routes:"]
+        lines += [f"  {start} -> {end}: {count}" for start, end, count in routes.top_pairs(5)]
+        lines += ["", "Busiest hours:"]
+        lines += [f"  {hour:02d}:00: {count} routes" for hour, count in routes.busiest_hours(3)]
+        lines += ["", "Slowest routes to compute:"]
+        lines += [f"  {start} -> {end}: {mean * 1000:.1f} ms avg over {count}"
+                  for start, end, count, mean in routes.mean_latency(5)]
+        messagebox.showinfo("Route Insights", "\n".join(lines))
+
+    def warm_up_routes(self):
+        """Precompute routes from the most popular start locations in the background."""
+        sources = self.route_history.popular_sources(self.nav.tree_cache.max_trees)
+        if sources:
+            self.router.submit(self.nav.warm_up, sources, on_done=lambda built: self.update_status(
+                f"Ready (routes from {built} popular locations precomputed)"))
 
     def export_history_tab(self):
         filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt")])
         if filename:
-            self.history.export_to_file(filename)
-            messagebox.showinfo("Success", f"History exported to {filename}")
+            count = self.history_log.export(filename, formatter=record_entry)
+            messagebox.showinfo("Success", f"{count} history entries exported to {filename}")
 
     # ---------------- Event Tab (Calendar Style) ----------------
     def create_event_tab(self):
@@ -0,0 +1,295 @@
+# map_canvas.py
+import tkinter as tk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from map_visualization import campus_layout, draw_closures, draw_isochrone, draw_routes
+from spatial_index import ClusterLevel, GridIndex
+
+# Level of detail, by how many nodes fall inside the viewport
+LABEL_LIMIT = 150          # node names
+EDGE_LABEL_LIMIT = 200     # edge distances (counted in visible edges)
+DETAIL_LIMIT = 5000        # above this, nodes are aggregated into clusters
+# Clusters across the viewport width when zoomed out
+CLUSTER_CELLS = 48
+MAX_CLUSTER_SIDE = 1024
+ZOOM_STEP = 1.25
+
+
+def _polyline(start, end):
+    """x and y arrays drawing every start[i] -> end[i] segment as one NaN-separated path.
+
+    One path renders much faster than a collection of thousands of segments.
+    """
+    xy = np.full((len(start), 3, 2), np.nan)
+    xy[:, 0] = start
+    xy[:, 1] = end
+    xy = xy.reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+
+def _edge_arrays(graph):
+    """(names, u, v, weight) arrays of the undirected edges of graph.
+
+    graph is a Navigation adjacency dict or a CompactGraph; closed (infinite)
+    edges are left out and each pair keeps its shortest weight.
+    """
+    if hasattr(graph, "offsets"):
+        names = graph.names
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        u = np.repeat(np.arange(len(names)), np.diff(offsets))
+        v = np.frombuffer(graph.targets, dtype=np.int32).astype(np.int64)
+        w = np.asarray(graph.weights, dtype=float)
+    else:
+        names = list(graph)
+        index = {name: i for i, name in enumerate(names)}
+        for neighbors in graph.values():
+            for neighbor, _ in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = len(names)
+                    names.append(neighbor)
+        pairs = [(index[a], index[b], weight) for a, neighbors in graph.items() for b, weight in neighbors]
+        u = np.array([p[0] for p in pairs], dtype=np.int64)
+        v = np.array([p[1] for p in pairs], dtype=np.int64)
+        w = np.array([p[2] for p in pairs], dtype=float)
+    keep = np.isfinite(w) & (u != v)
+    u, v, w = u[keep], v[keep], w[keep]
+    a, b = np.minimum(u, v), np.maximum(u, v)
+    # sort by pair then weight so the first of each pair is its shortest edge
+    order = np.lexsort((w, a * len(names) + b))
+    _, first = np.unique((a * len(names) + b)[order], return_index=True)
+    pick = order[first]
+    return names, a[pick], b[pick], w[pick]
+
+
+class MapView(tk.Frame):
+    """Campus map embedded in a Tk container.
+
+    The base map (nodes, edges, labels) is rendered for the current viewport
+    and kept as a raster; routes, closures and isochrones are overlay
+    artists blitted on top of it, so swapping them never re-renders the
+    base map. Scroll to zoom, drag to pan, double-click to reset the view.
+
+    Only what lies in the viewport is drawn: a grid index culls nodes,
+    names and distances appear only when few enough nodes are visible, and
+    when zoomed far out nodes are drawn as clusters.
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.figure = Figure(figsize=(8, 6))
+        self.ax = self.figure.add_axes([0, 0, 1, 1])
+        self.ax.set_axis_off()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # A full draw (first show, resize, pan/zoom) re-captures the base raster
+        self.canvas.mpl_connect("draw_event", self._capture_background)
+        self.canvas.mpl_connect("scroll_event", self._on_scroll)
+        self.canvas.mpl_connect("button_press_event", self._on_press)
+        self.canvas.mpl_connect("motion_notify_event", self._on_motion)
+        self.canvas.mpl_connect("button_release_event", self._on_release)
+        self._background = None
+        self._graph_key = None
+        self._pos = None
+        self._overlays = {}
+        self._base = []
+        self._clusters = {}
+        self._drag = None
+        self._render_pending = False
+
+    # ---------------- Graph and base layer ----------------
+    def set_graph(self, graph, key=None, positions=None):
+        """Show graph (an adjacency dict or a CompactGraph).
+
+        positions {name: (x, y)} are used when they cover every node,
+        otherwise the cached spring layout is. key identifies the graph
+        contents (e.g. Navigation.version); when it matches the graph
+        already shown nothing is redrawn.
+        """
+        if key is not None and key == self._graph_key:
+            return
+        names, self._u, self._v, self._w = _edge_arrays(graph)
+        if not positions or any(name not in positions for name in names):
+            adjacency = {name: [] for name in names}
+            for u, v, w in zip(self._u.tolist(), self._v.tolist(), self._w.tolist()):
+                adjacency[names[u]].append((names[v], w))
+            positions = campus_layout(adjacency)
+        self._names = names
+        self._pos = positions
+        self._ids = {name: i for i, name in enumerate(names)}
+        self._xy = np.array([positions[name] for name in names], dtype=float).reshape(-1, 2)
+        self._index = GridIndex(self._xy)
+        self._clusters = {}
+        self._graph_key = key
+        # Big markers only make sense while every name fits on screen
+        self._node_size = 900 if len(names) <= LABEL_LIMIT else 30
+
+        for artists in self._overlays.values():
+            for artist in artists:
+                artist.remove()
+        self._overlays = {}
+        self.reset_view()
+
+    def reset_view(self):
+        if not len(self._xy):
+            return
+        lo, hi = self._xy.min(axis=0), self._xy.max(axis=0)
+        pad = np.maximum((hi - lo) * 0.08, 1e-6)
+        self.ax.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+        self.ax.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+        self._render()
+
+    def _render(self):
+        self._render_pending = False
+        for artist in self._base:
+            artist.remove()
+        self._base = []
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        if self._index.count(x0, y0, x1, y1) > DETAIL_LIMIT:
+            self._draw_clusters(x0, y0, x1, y1)
+        else:
+            self._draw_detail(x0, y0, x1, y1)
+        self._background = None
+        self.canvas.draw_idle()
+
+    def _draw_detail(self, x0, y0, x1, y1):
+        ax, xy = self.ax, self._xy
+        ids = self._index.query(x0, y0, x1, y1)
+        visible = np.zeros(len(xy), dtype=bool)
+        visible[ids] = True
+        # edges with an end in view; campus edges are short enough that
+        # ones crossing the view with both ends outside are not missed
+        edges = np.flatnonzero(visible[self._u] | visible[self._v])
+        u, v = self._u[edges], self._v[edges]
+        lines, = ax.plot(*_polyline(xy[u], xy[v]), color="gray", linewidth=1, zorder=1, scalex=False, scaley=False)
+        labels = len(ids) <= LABEL_LIMIT
+        # plain markers of one size hit Agg's fast marker path
+        nodes, = ax.plot(xy[ids, 0], xy[ids, 1], "o", markersize=28 if labels else 3.5, color="lightblue",
+                         zorder=2, scalex=False, scaley=False)
+        self._base += [lines, nodes]
+        if labels:
+            for i in ids:
+                self._base.append(ax.text(xy[i, 0], xy[i, 1], self._names[i], fontsize=10,
+                                          ha="center", va="center", zorder=3))
+        if len(edges) <= EDGE_LABEL_LIMIT:
+            mid = (xy[u] + xy[v]) / 2
+            for (x, y), w in zip(mid, self._w[edges]):
+                self._base.append(ax.text(x, y, f"{w:g}", fontsize=8, ha="center", va="center", zorder=3,
+                                          bbox=dict(boxstyle="round", fc="white", ec="white")))
+
+    def _draw_clusters(self, x0, y0, x1, y1):
+        level = self._cluster_level(x1 - x0)
+        cx, cy = level.xy[:, 0], level.xy[:, 1]
+        inside = (cx >= x0) & (cx <= x1) & (cy >= y0) & (cy <= y1)
+        links = np.flatnonzero(inside[level.links_u] | inside[level.links_v])
+        a, b = level.links_u[links], level.links_v[links]
+        lines, = self.ax.plot(*_polyline(level.xy[a], level.xy[b]), color="gray", linewidth=0.6,
+                              zorder=1, scalex=False, scaley=False)
+        self._base.append(lines)
+        # Three marker sizes by cluster population, one artist each
+        counts = level.counts[inside]
+        size_class = np.digitize(counts, np.quantile(counts, [0.5, 0.9])) if len(counts) else counts
+        for size, markersize in enumerate((4, 6, 9)):
+            chosen = size_class == size
+            nodes, = self.ax.plot(cx[inside][chosen], cy[inside][chosen], "o", markersize=markersize,
+                                  color="lightblue", markeredgecolor="steelblue", zorder=2,
+                                  scalex=False, scaley=False)
+            self._base.append(nodes)
+
+    def _cluster_level(self, view_width):
+        lo, hi = self._index.lo, self._index.hi
+        wanted = CLUSTER_CELLS * max(hi[0] - lo[0], 1e-12) / max(view_width, 1e-12)
+        side = 8
+        while side < wanted and side < MAX_CLUSTER_SIDE:
+            side *= 2
+        level = self._clusters.get(side)
+        if level is None:
+            level = self._clusters[side] = ClusterLevel(self._xy, lo, hi, side, self._u, self._v)
+        return level
+
+    # ---------------- Overlays ----------------
+    def show_route(self, path, alternatives=None):
+        self._set_overlay("route", draw_routes(self.ax, self._pos, path, alternatives, self._node_size))
+
+    def show_isochrone(self, isochrone):
+        reachable = np.zeros(len(self._names), dtype=bool)
+        reachable[[self._ids[name] for name in isochrone if name in self._ids]] = True
+        both = np.flatnonzero(reachable[self._u] & reachable[self._v])
+        edges = [(self._names[u], self._names[v]) for u, v in zip(self._u[both], self._v[both])]
+        self._set_overlay("isochrone", draw_isochrone(self.ax, self._pos, isochrone, edges,
+                                                      alpha=0.35, node_size=self._node_size * 1.5))
+
+    def show_closures(self, closed):
+        self._set_overlay("closures", draw_closures(self.ax, self._pos, closed))
+
+    def clear_overlay(self, name):
+        self._set_overlay(name, [])
+
+    def _set_overlay(self, name, artists):
+        if self._pos is None:
+            raise ValueError("set_graph() must be called before drawing overlays")
+        for artist in self._overlays.pop(name, []):
+            artist.remove()
+        for artist in artists:
+            # Animated artists are skipped by full draws and only blitted
+            artist.set_animated(True)
+        if artists:
+            self._overlays[name] = artists
+        self._blit()
+
+    def _capture_background(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._blit()
+
+    def _blit(self):
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        # Isochrone shading goes underneath the routes
+        for name in ("isochrone", "closures", "route"):
+            for artist in self._overlays.get(name, []):
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    # ---------------- Pan and zoom ----------------
+    def _schedule_render(self):
+        # Coalesce bursts of scroll/motion events into one re-render
+        if not self._render_pending and self._pos is not None:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax:
+            return
+        factor = 1 / ZOOM_STEP if event.button == "up" else ZOOM_STEP
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        x, y = event.xdata, event.ydata
+        self.ax.set_xlim(x - (x - x0) * factor, x + (x1 - x) * factor)
+        self.ax.set_ylim(y - (y - y0) * factor, y + (y1 - y) * factor)
+        self._schedule_render()
+
+    def _on_press(self, event):
+        if event.inaxes is not self.ax or event.button != 1:
+            return
+        if event.dblclick:
+            self.reset_view()
+            return
+        self._drag = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _on_motion(self, event):
+        if self._drag is None:
+            return
+        px, py, (x0, x1), (y0, y1) = self._drag
+        # pixel deltas, since data coordinates move with the view
+        dx = (event.x - px) * (x1 - x0) / self.ax.bbox.width
+        dy = (event.y - py) * (y1 - y0) / self.ax.bbox.height
+        self.ax.set_xlim(x0 - dx, x1 - dx)
+        self.ax.set_ylim(y0 - dy, y1 - dy)
+        self._schedule_render()
+
+    def _on_release(self, event):
+        self._drag = None
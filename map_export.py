@@ -0,0 +1,188 @@
+# map_export.py
+"""Headless batch export of route maps.
+
+    python map_export.py pairs.csv --out route_cards --format svg
+
+pairs.csv holds one "start,end" pair per line. Pairs are grouped by
+start location into small tasks; a process pool worker runs one early-exit
+search per task and renders its routes. Each worker draws the base map
+once and only swaps the route highlight (for PNG the base raster itself is
+reused, so only the route is drawn).
+"""
+import argparse
+import csv
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+
+from map_visualization import campus_layout, draw_base, draw_routes, _as_networkx_graph
+from navigation import Navigation
+from routing_graph import INF
+
+FORMATS = ("png", "svg")
+# Tasks queued per worker; bounds memory however long the batch is
+QUEUE_PER_WORKER = 4
+# Routes per task; every task runs its own search from the shared start
+TARGETS_PER_TASK = 16
+# zlib level for PNG cards; higher levels are several times slower to encode
+PNG_COMPRESSION = 3
+
+
+def _slug(name):
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_") or "x"
+
+
+def route_tasks(pairs, out_dir, fmt):
+    """Yield (start, [(filename, end), ...]) tasks, at most TARGETS_PER_TASK ends each.
+
+    Only the pairs are grouped here; routes are computed by the worker that
+    renders them, so no task holds more than one search's state.
+    """
+    by_start = {}
+    for i, (start, end) in enumerate(pairs):
+        filename = os.path.join(out_dir, f"{i:04d}_{_slug(start)}_{_slug(end)}.{fmt}")
+        by_start.setdefault(start, []).append((filename, end))
+    for start, targets in by_start.items():
+        for k in range(0, len(targets), TARGETS_PER_TASK):
+            yield start, targets[k:k + TARGETS_PER_TASK]
+
+
+def export_routes(nav, pairs, out_dir, fmt="png", workers=None):
+    """Render one map per (start, end) pair into out_dir.
+
+    Returns {"maps", "unreachable", "seconds", "maps_per_sec"}. workers=None
+    uses every CPU; 0 or 1 renders in-process.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt!r}")
+    pairs = list(pairs)
+    for name in {name for pair in pairs for name in pair}:
+        if name not in nav.graph:
+            raise ValueError(f"Unknown location: {name!r}")
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    # Positions are computed (or loaded from the layout cache) once here
+    # and shared with every worker
+    positions = campus_layout(nav.graph)
+    init_args = (nav.graph, nav.compiled(), positions, fmt)
+    tasks = route_tasks(pairs, out_dir, fmt)
+
+    maps = 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_render_task, *task))
+                if len(pending) >= workers * QUEUE_PER_WORKER:
+                    maps += pending.popleft().result()
+            while pending:
+                maps += pending.popleft().result()
+    else:
+        _init_worker(*init_args)
+        for task in tasks:
+            maps += _render_task(*task)
+
+    seconds = time.perf_counter() - started
+    return {
+        "maps": maps,
+        "unreachable": len(pairs) - maps,
+        "seconds": seconds,
+        "maps_per_sec": maps / seconds if seconds else 0.0,
+    }
+
+
+_worker = None
+
+
+def _init_worker(graph, compact, positions, fmt):
+    """Draw the base map once per process; routes are added on top per map."""
+    global _worker
+    figure = Figure(figsize=(8, 6))
+    FigureCanvasAgg(figure)
+    ax = figure.add_axes([0, 0, 1, 0.93])
+    ax.set_axis_off()
+    labels = draw_base(ax, _as_networkx_graph(graph), positions)
+    # Animated artists are left out of the PNG base raster and blitted per
+    # map; savefig skips them, so SVG titles must not be animated
+    title = figure.suptitle("", fontsize=14, animated=fmt == "png")
+    background = None
+    if fmt == "png":
+        # Animated artists (title, routes) are left out of this raster
+        figure.canvas.draw()
+        background = figure.canvas.copy_from_bbox(figure.bbox)
+    _worker = (compact, figure, ax, title, labels, positions, fmt, background)
+
+
+def _render_task(start, targets):
+    """Route from start to every (filename, end) in targets and render each map.
+
+    Returns the number of maps written; unreachable ends are skipped.
+    """
+    graph = _worker[0]
+    source = graph.index[start]
+    ids = [graph.index[end] for _, end in targets]
+    dist, pred = graph.shortest_path_tree(source, targets=ids)
+    maps = 0
+    for (filename, end), target in zip(targets, ids):
+        if dist[target] == INF:
+            continue
+        path = [graph.names[i] for i in graph.path_ids(pred, source, target)]
+        _render(filename, start, end, path, graph.distance(dist[target]))
+        maps += 1
+    return maps
+
+
+def _render(filename, start, end, path, distance):
+    _, figure, ax, title, labels, positions, fmt, background = _worker
+    artists = draw_routes(ax, positions, path)
+    title.set_text(f"{start} -> {end} ({distance} m)")
+    try:
+        if background is None:
+            figure.savefig(filename, format=fmt)
+        else:
+            canvas = figure.canvas
+            canvas.restore_region(background)
+            for artist in artists:
+                ax.draw_artist(artist)
+            # the highlighted nodes cover their names in the base raster
+            for node in path:
+                ax.draw_artist(labels[node])
+            figure.draw_artist(title)
+            imsave(filename, np.asarray(canvas.buffer_rgba()), format="png",
+                   pil_kwargs={"compress_level": PNG_COMPRESSION})
+    finally:
+        # Drop the highlight so the next map starts from the bare base
+        for artist in artists:
+            artist.remove()
+    return filename
+
+
+def read_pairs(filename):
+    with open(filename, newline="", encoding="utf-8") as f:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export route maps for many (start, end) pairs")
+    parser.add_argument("pairs", help="CSV file with one start,end pair per line")
+    parser.add_argument("--out", default="route_maps")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    stats = export_routes(Navigation(), read_pairs(args.pairs), args.out, args.format, args.workers)
+    print(f"{stats['maps']} maps in {stats['seconds']:.1f} s ({stats['maps_per_sec']:.1f} maps/s), "
+          f"{stats['unreachable']} unreachable pairs skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,28 @@
+import hashlib
+import os
+import pickle
+import random
+from collections import OrderedDict
+
 import matplotlib.pyplot as plt
 import networkx as nx
+from matplotlib.collections import LineCollection
+
+# Colors for alternative routes; the main path stays red
+ALTERNATIVE_COLORS = ["tab:blue", "tab:green", "tab:purple", "tab:brown", "tab:olive"]
+
+# Node positions are cached per graph, in memory and in LAYOUT_FILE (next
+# to this module, whatever the working directory), so
+# repeated draws skip the spring layout
+LAYOUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "campus_layout.pkl")
+LAYOUT_FORMAT = 1
+MAX_CACHED_LAYOUTS = 8
+# When at most this fraction of nodes was added or removed, the previous
+# positions are kept and only new nodes and their neighbors are relaxed
+WARM_START_CHANGE = 0.1
+WARM_START_ITERATIONS = 30
+
+_layouts = OrderedDict()
 
 def _as_networkx_graph(graph_like):
     """Convert various graph representations to a NetworkX Graph.
@@ -29,36 +52,187 @@ def _as_networkx_graph(graph_like):
         return G
     raise TypeError("Unsupported graph representation: %r" % type(graph_like))
 
-def draw_campus(graph, path=None):
-    """Draw the campus map using a NetworkX graph.
+def _layout_fingerprint(G):
+    """Hash of the node and edge sets; weight-only edits keep their layout."""
+    h = hashlib.sha1()
+    for node in sorted(map(str, G.nodes())):
+        h.update(node.encode("utf-8") + b"\0")
+    h.update(b"\1")
+    for u, v in sorted(tuple(sorted((str(u), str(v)))) for u, v in G.edges()):
+        h.update(f"{u}\0{v}\0".encode("utf-8"))
+    return h.hexdigest()
 
-    Args:
-        graph: Graph structure of the campus (dict or nx.Graph).
-        path (list[str]): Optional list of nodes representing the shortest path.
+
+def _load_layout(filename):
+    try:
+        with open(filename, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if data.get("format") != LAYOUT_FORMAT:
+        return None
+    return data
+
+
+def _save_layout(filename, fingerprint, positions):
+    data = {"format": LAYOUT_FORMAT, "fingerprint": fingerprint, "positions": positions}
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, filename)
+
+
+def _compute_layout(G, previous=None):
+    """Spring layout, warm-started from previous positions after small edits."""
+    if previous:
+        known = {node: previous[node] for node in G if node in previous}
+        added = [node for node in G if node not in known]
+        changed = len(added) + sum(1 for node in previous if node not in G)
+        if known and changed <= WARM_START_CHANGE * len(G):
+            if not added:
+                return known
+            rng = random.Random(42)
+            free = set(added)
+            for node in added:
+                free.update(G[node])
+                # New nodes start next to their already placed neighbors
+                placed = [known[n] for n in G[node] if n in known]
+                if placed:
+                    x = sum(p[0] for p in placed) / len(placed)
+                    y = sum(p[1] for p in placed) / len(placed)
+                    known[node] = (x + rng.uniform(-0.02, 0.02), y + rng.uniform(-0.02, 0.02))
+            fixed = [node for node in known if node not in free]
+            pos = nx.spring_layout(G, pos=known, fixed=fixed or None,
+                                   iterations=WARM_START_ITERATIONS, seed=42)
+            return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+    pos = nx.spring_layout(G, seed=42)  # fixed seed = stable layout
+    return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+
+
+def campus_layout(graph, filename=LAYOUT_FILE):
+    """Return {node: (x, y)} positions for graph, computing them at most once.
+
+    Layouts are kept in memory and in filename (pass None to skip the
+    file). A graph that differs from the last one laid out by only a few
+    nodes is warm-started from those positions.
     """
     G = _as_networkx_graph(graph)
+    fingerprint = _layout_fingerprint(G)
+    pos = _layouts.get(fingerprint)
+    if pos is not None:
+        _layouts.move_to_end(fingerprint)
+        return pos
 
-    # Layout for positioning
-    pos = nx.spring_layout(G, seed=42)  # fixed seed = stable layout
+    saved = _load_layout(filename) if filename else None
+    if saved is not None and saved["fingerprint"] == fingerprint:
+        pos = saved["positions"]
+    else:
+        if _layouts:
+            previous = next(reversed(_layouts.values()))
+        else:
+            previous = saved["positions"] if saved is not None else None
+        pos = _compute_layout(G, previous)
+        if filename:
+            _save_layout(filename, fingerprint, pos)
 
-    # Draw nodes + labels
-    nx.draw_networkx_nodes(G, pos, node_color="lightblue", node_size=800)
-    nx.draw_networkx_labels(G, pos, font_size=10, font_family="Arial")
+    _layouts[fingerprint] = pos
+    if len(_layouts) > MAX_CACHED_LAYOUTS:
+        _layouts.popitem(last=False)
+    return pos
 
-    # Draw edges
-    nx.draw_networkx_edges(G, pos, edge_color="gray")
 
-    # Draw edge weights (distances)
+def draw_base(ax, G, pos):
+    """Draw the static map (nodes, labels, edges and distances) onto ax.
+
+    Returns the {node: Text} labels.
+    """
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color="lightblue", node_size=800)
+    labels = nx.draw_networkx_labels(G, pos, ax=ax, font_size=10, font_family="Arial")
+    nx.draw_networkx_edges(G, pos, ax=ax, edge_color="gray")
     edge_labels = nx.get_edge_attributes(G, "weight")
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
+    nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=edge_labels, font_size=8)
+    return labels
 
-    # If a path was given, highlight it
+
+def draw_isochrone(ax, pos, isochrone, edges=(), alpha=0.5, node_size=1400):
+    """Shade reachable {node: distance} from near (dark) to far (light); returns the artists.
+
+    edges are the (u, v) pairs between reachable nodes to shade as well.
+    """
+    reachable = [node for node in isochrone if node in pos]
+    if not reachable:
+        return []
+    lines = LineCollection([(pos[u], pos[v]) for u, v in edges],
+                           colors="yellowgreen", linewidths=6, alpha=alpha)
+    ax.add_collection(lines)
+    nodes = ax.scatter([pos[node][0] for node in reachable], [pos[node][1] for node in reachable],
+                       s=node_size, c=[isochrone[node] for node in reachable], cmap=plt.cm.YlGn_r,
+                       alpha=alpha, zorder=2)
+    return [lines, nodes]
+
+
+def draw_routes(ax, pos, path=None, alternatives=None, node_size=900):
+    """Highlight path (red) over dashed alternatives; returns the artists."""
+    artists = []
+    # Alternatives go underneath so the main path stays on top
+    for i, route in enumerate(alternatives or []):
+        if len(route) > 1:
+            color = ALTERNATIVE_COLORS[i % len(ALTERNATIVE_COLORS)]
+            lines = LineCollection([(pos[u], pos[v]) for u, v in zip(route, route[1:])],
+                                   colors=color, linewidths=2, linestyles="dashed")
+            ax.add_collection(lines)
+            artists.append(lines)
     if path and len(path) > 1:
-        path_edges = list(zip(path, path[1:]))
-        nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color="red", width=3)
-        nx.draw_networkx_nodes(G, pos, nodelist=path, node_color="orange", node_size=900)
+        lines = LineCollection([(pos[u], pos[v]) for u, v in zip(path, path[1:])],
+                               colors="red", linewidths=3)
+        ax.add_collection(lines)
+        nodes = ax.scatter([pos[node][0] for node in path], [pos[node][1] for node in path],
+                           s=node_size, c="orange", zorder=2)
+        artists += [lines, nodes]
+    return artists
+
+
+def draw_closures(ax, pos, closed):
+    """Mark closed edges [(a, b), ...] with a dotted black line; returns the artists.
+
+    Closed edges are no longer in the graph, so only positions are needed.
+    """
+    segments = [(pos[u], pos[v]) for u, v in closed if u in pos and v in pos]
+    if not segments:
+        return []
+    lines = LineCollection(segments, colors="black", linewidths=2, linestyles="dotted")
+    ax.add_collection(lines)
+    xs = [(a[0] + b[0]) / 2 for a, b in segments]
+    ys = [(a[1] + b[1]) / 2 for a, b in segments]
+    marks = ax.scatter(xs, ys, marker="x", s=120, c="black", zorder=3)
+    return [lines, marks]
+
+
+def draw_campus(graph, path=None, alternatives=None, isochrone=None):
+    """Draw the campus map using a NetworkX graph.
+
+    Args:
+        graph: Graph structure of the campus (dict or nx.Graph).
+        path (list[str]): Optional list of nodes representing the shortest path.
+        alternatives (list[list[str]]): Optional alternative routes, each
+            highlighted in its own color underneath the main path.
+        isochrone (dict[str, float]): Optional {node: distance} of reachable
+            locations, shaded from near (dark) to far (light).
+    """
+    G = _as_networkx_graph(graph)
+
+    # Layout for positioning, cached per graph
+    pos = campus_layout(G)
+    ax = plt.gca()
+
+    # Shade the reachable area underneath the regular nodes
+    if isochrone:
+        draw_isochrone(ax, pos, isochrone, [(u, v) for u, v in G.edges(isochrone)
+                                            if u in isochrone and v in isochrone])
+    draw_base(ax, G, pos)
+    draw_routes(ax, pos, path, alternatives)
 
     # Show plot
     plt.title("Campus Map", fontsize=14)
     plt.axis("off")
-    plt.show()
\ No newline at end of file
+    plt.show()
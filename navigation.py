@@ -1,8 +1,44 @@
 # navigation.py 
-import heapq
+from routing_graph import CompactGraph
+from heuristics import LANDMARK_FILE, LandmarkTable, euclidean_heuristic
+from contraction import CH_FILE, ContractionHierarchy
+from route_cache import ShortestPathTree, TreeCache
+import distance_matrix
+from alternatives import k_shortest_paths
+from facilities import FacilityForest
+from instrumentation import QueryStats
+from location_index import LocationIndex
+import tour
+
+# Average walking speed used to turn time budgets into distances
+WALKING_SPEED = 80  # meters per minute
+ROUTING_METHODS = ("dijkstra", "bidirectional", "astar", "alt", "ch")
+
+
+def _budget(max_distance, max_minutes):
+    """Distance budget in meters from max_distance or max_minutes of walking."""
+    budget = max_distance if max_minutes is None else max_minutes * WALKING_SPEED
+    if budget is None:
+        raise ValueError("Give max_distance or max_minutes")
+    return budget
+
 
 class Navigation:
-    def __init__(self):
+    def __init__(self, coordinates=None, max_cached_trees=16):
+        # Bumped on every graph change; cached results carry the version
+        # they were computed for
+        self.version = 0
+        self.tree_cache = TreeCache(max_cached_trees)
+        # Number of nodes settled by the most recent shortest_path call
+        self.last_settled = 0
+        # QueryStats while instrumentation is enabled, see enable_instrumentation()
+        self.query_stats = None
+        # Facility locations by kind as registered, and the ones in the graph,
+        # e.g. {"Medical Center": ["Clinic"]}
+        self._facility_locations = {}
+        self.facilities = {}
+        # Closed edges {(a, b): weight to restore on reopen}
+        self.closed = {}
         self.graph = {
             "Main Gate": [("Library", 200), ("Admin Block", 150)],
             "Library": [("Main Gate", 200), ("Canteen", 100), ("Engineering Faculty", 250)],
@@ -14,33 +50,386 @@ class Navigation:
             "Auditorium": [("Admin Block", 300), ("Science Faculty", 300)],
             "Hostel": [("Canteen", 400)]
         }
+        # Optional node positions {name: (x, y)} in meters, used by A*
+        self.coordinates = dict(coordinates or {})
+        # Alternative names {alias: location} offered by search_locations
+        self.aliases = {}
+        # Cached trees checked / repaired / nodes relabelled by the last edge change
+        self.last_repair = {"trees": 0, "repaired": 0, "relabelled": 0}
+
+    @property
+    def graph(self):
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph):
+        self._graph = graph
+        # Closures were made in the old graph; the new one starts fully open
+        self.closed = {}
+        self.graph_changed()
+
+    def graph_changed(self):
+        """Drop structures derived from self.graph after it has been edited.
+
+        Assigning self.graph calls this automatically; call it by hand after
+        editing the adjacency lists in place.
+        """
+        self.version += 1
+        self._compiled = None
+        self.landmarks = None
+        self.hierarchy = None
+        self.tree_cache.clear()
+        self._forests = {}
+        self._location_index = None
+        # Facilities and closures at locations that are gone are dropped
+        self.facilities = {kind: [name for name in locations if name in self.graph]
+                           for kind, locations in self._facility_locations.items()}
+        self.closed = {(u, v): weight for (u, v), weight in self.closed.items() if u in self.graph}
+
+    # ---------------- Runtime edge changes ----------------
+    def close_edge(self, a, b, both_ways=True):
+        """Close the path a -> b (and b -> a) until reopen_edge is called."""
+        for u, v in ((a, b), (b, a)) if both_ways else ((a, b),):
+            if (u, v) in self.closed:
+                continue
+            weights = [w for neighbor, w in self.graph.get(u, ()) if neighbor == v]
+            if not weights:
+                raise ValueError(f"No path from {u!r} to {v!r}")
+            self.graph[u][:] = [entry for entry in self.graph[u] if entry[0] != v]
+            self.closed[(u, v)] = min(weights)
+            self._edge_changed(u, v, float("inf"))
+
+    def reopen_edge(self, a, b, both_ways=True):
+        """Reopen a path closed with close_edge."""
+        for u, v in ((a, b), (b, a)) if both_ways else ((a, b),):
+            if (u, v) not in self.closed:
+                continue
+            weight = self.closed.pop((u, v))
+            self.graph[u].append((v, weight))
+            self._edge_changed(u, v, weight)
+
+    def set_edge_weight(self, a, b, weight, both_ways=True):
+        """Change the length of the path a -> b (and b -> a)."""
+        if weight < 0:
+            raise ValueError("Edge weights must be non-negative")
+        for u, v in ((a, b), (b, a)) if both_ways else ((a, b),):
+            if (u, v) in self.closed:
+                self.closed[(u, v)] = weight
+                continue
+            if not any(neighbor == v for neighbor, _ in self.graph.get(u, ())):
+                raise ValueError(f"No path from {u!r} to {v!r}")
+            self.graph[u][:] = [(n, weight if n == v else w) for n, w in self.graph[u]]
+            self._edge_changed(u, v, weight)
+
+    def _edge_changed(self, u, v, weight):
+        """Apply one edge change to the compiled graph and repair cached trees."""
+        graph = self._compiled
+        old = None
+        if graph is not None and u in graph.index and v in graph.index:
+            old = graph.set_weight(graph.index[u], graph.index[v], weight)
+        if old is None:
+            # The edge is not in the compiled graph; recompile from scratch
+            self.graph_changed()
+            return
+
+        self.version += 1
+        self.hierarchy = None
+        if weight < old:
+            # Landmark bounds stay valid only while edges get longer
+            self.landmarks = None
+        repair = {"trees": 0, "repaired": 0, "relabelled": 0}
+        source, target = graph.index[u], graph.index[v]
+        for tree in self.tree_cache.trees():
+            if tree.version != self.version - 1:
+                continue
+            relabelled = graph.repair_tree(tree.dist, tree.pred, source, target, old, weight)
+            tree.version = self.version
+            repair["trees"] += 1
+            repair["repaired"] += bool(relabelled)
+            repair["relabelled"] += relabelled
+        self.last_repair = repair
+        # Facility forests grow over the reverse graph, where the edge is v -> u
+        for forest in list(self._forests.values()):
+            if forest.version == self.version - 1:
+                graph.repair_tree(forest.dist, forest.pred, target, source, old, weight, reverse=True)
+                forest.version = self.version
+
+    # ---------------- Reachability ----------------
+    def reachable_within(self, center, max_distance=None, max_minutes=None):
+        """Return {location: distance} for everything within the budget.
+
+        center may be one location or a list of them, in which case the
+        distance is to the nearest center and all of them share one search.
+        The budget is max_distance in meters or max_minutes of walking.
+        """
+        budget = _budget(max_distance, max_minutes)
+        centers = [center] if isinstance(center, str) else list(center)
+        centers = [name for name in centers if name in self.graph]
+        if not centers:
+            return {}
+        graph = self.compiled()
+        reached = graph.bounded([graph.index[name] for name in centers], budget)
+        return {graph.names[i]: graph.distance(d) for i, d in reached.items()}
+
+    def isochrones(self, centers, max_distance=None, max_minutes=None):
+        """Return {center: {location: distance}} for several centers at once.
+
+        All centers share one multi-source bounded search, so the cost is
+        that of a single search over the union of their areas. Each location
+        is listed under its nearest center only (ties go to whichever center
+        reached it first); use reachable_within per center for overlapping
+        areas.
+        """
+        budget = _budget(max_distance, max_minutes)
+        result = {center: {} for center in centers}
+        known = [name for name in result if name in self.graph]
+        if not known:
+            return result
+        graph = self.compiled()
+        reached = graph.bounded([graph.index[name] for name in known], budget, nearest=True)
+        for i, (d, source) in reached.items():
+            result[graph.names[source]][graph.names[i]] = graph.distance(d)
+        return result
+
+    # ---------------- Nearest facility ----------------
+    def set_facilities(self, kind, locations):
+        """Register the locations offering a kind of facility and precompute
+        the shortest-path forest towards them."""
+        self._facility_locations[kind] = list(locations)
+        self.facilities[kind] = [name for name in locations if name in self.graph]
+        self._forests.pop(kind, None)
+        if self.facilities[kind]:
+            self._forest(kind)
+
+    def _forest(self, kind):
+        forest = self._forests.get(kind)
+        if forest is None or forest.version != self.version:
+            graph = self.compiled()
+            sources = [graph.index[name] for name in self.facilities[kind]]
+            forest = self._forests[kind] = FacilityForest.build(graph, kind, sources, self.version)
+        return forest
+
+    def nearest_facility(self, kind, location):
+        """Return (facility, path, distance) for the closest facility of a kind.
+
+        A lookup in the precomputed forest plus a walk along the path;
+        returns (None, None, inf) if none is reachable.
+        """
+        if not self.facilities.get(kind) or location not in self.graph:
+            return None, None, float("inf")
+        graph = self.compiled()
+        ids, distance = self._forest(kind).route(graph.index[location])
+        if not ids:
+            return None, None, float("inf")
+        path = [graph.names[i] for i in ids]
+        return path[-1], path, graph.distance(distance)
 
-    def shortest_path(self, start, destination):
+    # ---------------- Location search ----------------
+    def add_alias(self, alias, location):
+        """Let search_locations find location under another name, e.g. "Lib"."""
+        if location not in self.graph:
+            raise ValueError(f"Unknown location: {location!r}")
+        self.aliases[alias] = location
+        self._location_index = None
+
+    def search_locations(self, query, k=10):
+        """Return up to k location names completing query, best match first."""
+        if self._location_index is None:
+            # aliases of locations no longer in the graph are kept, but not offered
+            aliases = {alias: name for alias, name in self.aliases.items() if name in self.graph}
+            self._location_index = LocationIndex(self.graph, aliases)
+        return self._location_index.search(query, k)
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the shortest-path-tree cache."""
+        return self.tree_cache.stats()
+
+    def enable_instrumentation(self, window=1000):
+        """Start collecting per-query statistics; returns the QueryStats.
+
+        Latency percentiles cover the last `window` queries. Call
+        query_stats.profile(n) to run cProfile over the next n queries.
+        """
+        if self.query_stats is None:
+            self.query_stats = QueryStats(window)
+        return self.query_stats
+
+    def disable_instrumentation(self):
+        self.query_stats = None
+
+    def compiled(self):
+        """Return the integer-indexed CSR form of self.graph, building it on demand."""
+        if self._compiled is None:
+            self._compiled = CompactGraph(self.graph)
+        return self._compiled
+
+    def prepare_landmarks(self, count=8, filename=LANDMARK_FILE):
+        """Load or build the landmark tables used by method="alt".
+
+        The tables are read from filename if they match the current graph,
+        and written back after a rebuild; pass None to skip the file.
+        """
+        graph = self.compiled()
+        table = LandmarkTable.load(filename, graph) if filename else None
+        if table is None:
+            table = LandmarkTable.build(graph, count)
+            if filename:
+                table.save(filename)
+        self.landmarks = table
+        return table
+
+    def prepare_contraction(self, filename=CH_FILE):
+        """Load or build the contraction hierarchy used by method="ch".
+
+        Intended for fixed graphs: preprocessing is slow, queries are very
+        fast. The hierarchy is read from filename if it matches the current
+        graph, and written back after a rebuild; pass None to skip the file.
+        """
+        graph = self.compiled()
+        hierarchy = ContractionHierarchy.load(filename, graph) if filename else None
+        if hierarchy is None:
+            hierarchy = ContractionHierarchy.build(graph)
+            if filename:
+                hierarchy.save(filename)
+        self.hierarchy = hierarchy
+        return hierarchy
+
+    def distance_matrix(self, sources, targets, workers=None):
+        """Return a DistanceMatrix from every source to every target.
+
+        Runs one search per source (in a process pool for large source
+        sets); use .distances for the NumPy table and .path(s, t) to rebuild
+        individual routes.
+        """
+        for name in list(sources) + list(targets):
+            if name not in self.graph:
+                raise ValueError(f"Unknown location: {name!r}")
+        return distance_matrix.compute(self.compiled(), sources, targets, workers)
+
+    def shortest_path(self, start, destination, method="dijkstra", cancel=None):
+        """Return (path, distance) from start to destination.
+
+        method is one of:
+          - "dijkstra": one-directional search
+          - "bidirectional": searches from both ends and stops once they meet
+          - "astar": A* guided by straight-line distance over self.coordinates
+            (requires every edge to be at least as long as that distance)
+          - "alt": A* with landmark lower bounds, see prepare_landmarks()
+          - "ch": contraction hierarchy query, see prepare_contraction()
+        If a shortest-path tree from start is cached it answers any method;
+        "dijkstra" builds and caches the full tree on a miss. The number of
+        nodes settled is left in self.last_settled.
+        """
+        stats = self.query_stats
+        if stats is None:
+            return self._shortest_path(start, destination, method, cancel)
+        with stats.query(self, method) as counters:
+            return self._shortest_path(start, destination, method, cancel, counters)
+
+    def _shortest_path(self, start, destination, method, cancel, counters=None):
+        # Checked up front so a cached tree can't make an unknown method succeed
+        if method not in ROUTING_METHODS:
+            raise ValueError(f"Unknown routing method: {method!r}")
+        self.last_settled = 0
         if start not in self.graph or destination not in self.graph:
             return None, float("inf")
+        graph = self.compiled()
+        source, target = graph.index[start], graph.index[destination]
 
-        distances = {node: float("inf") for node in self.graph}
-        distances[start] = 0
-        pq = [(0, start)]
-        prev = {}
+        tree = self.tree_cache.get(source, self.version)
+        if tree is None and method == "dijkstra" and self.tree_cache.max_trees > 0:
+            tree = self.shortest_path_tree(start, cancel, counters)
+            self.last_settled = sum(1 for d in tree.dist if d != float("inf"))
+        if tree is not None:
+            ids = graph.path_ids(tree.pred, source, target)
+            return [graph.names[i] for i in ids], graph.distance(tree.dist[target])
 
-        while pq:
-            current_distance, current_node = heapq.heappop(pq)
-            if current_distance > distances[current_node]:
-                continue
-            for neighbor, weight in self.graph[current_node]:
-                distance = current_distance + weight
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    prev[neighbor] = current_node
-                    heapq.heappush(pq, (distance, neighbor))
-
-        # Reconstruct path
-        path = []
-        node = destination
-        while node in prev:
-            path.insert(0, node)
-            node = prev[node]
-        if path:
-            path.insert(0, start)
-        return path, distances[destination]
+        if method == "dijkstra":
+            def search(s, t):
+                return graph.dijkstra(s, t, cancel, counters)
+        elif method == "bidirectional":
+            def search(s, t):
+                return graph.bidirectional(s, t, cancel, counters)
+        elif method == "astar":
+            def search(s, t):
+                return graph.astar(s, t, euclidean_heuristic(graph, self.coordinates, t), cancel, counters)
+        elif method == "alt":
+            if self.landmarks is None:
+                self.prepare_landmarks()
+            def search(s, t):
+                return graph.astar(s, t, self.landmarks.heuristic(t), cancel, counters)
+        elif method == "ch":
+            if self.hierarchy is None:
+                self.prepare_contraction()
+            def search(s, t):
+                path, distance, settled = self.hierarchy.query(s, t, counters)
+                return path, graph.distance(distance), settled
+
+        ids, distance, self.last_settled = search(source, target)
+        return [graph.names[i] for i in ids], distance
+
+    def alternative_routes(self, start, destination, k=3, time_budget_ms=None, max_overlap=None, cancel=None):
+        """Return up to k loopless routes [(path, distance), ...], shortest first.
+
+        time_budget_ms caps the search and returns the best routes found so
+        far; max_overlap (0..1) drops routes that share more than that
+        fraction of their length with an earlier one. Setting the cancel
+        event raises SearchCancelled.
+        """
+        if start not in self.graph or destination not in self.graph or start == destination:
+            return []
+        graph = self.compiled()
+        routes = k_shortest_paths(graph, graph.index[start], graph.index[destination],
+                                  k, time_budget_ms, max_overlap, cancel)
+        return [([graph.names[i] for i in ids], distance) for ids, distance in routes]
+
+    def plan_tour(self, stops, start=None, return_to_start=False, time_limit_ms=500):
+        """Order stops to minimize walking and stitch the full route.
+
+        The tour begins at start (or the first stop). Pairwise distances are
+        computed once with distance_matrix; see tour.plan_order for how the
+        order is chosen. Returns (order, path, distance); raises ValueError
+        if the chosen order has a leg with no route.
+        """
+        stops = list(dict.fromkeys(stops))
+        if start is not None:
+            stops = [start] + [stop for stop in stops if stop != start]
+        if not stops:
+            return [], [], 0
+        matrix = self.distance_matrix(stops, stops)
+        indices, distance = tour.plan_order(matrix.distances, return_to_start, time_limit_ms)
+        order = [stops[i] for i in indices]
+        if return_to_start:
+            order.append(order[0])
+
+        path = [order[0]]
+        for a, b in zip(order, order[1:]):
+            if matrix[a, b] == float("inf"):
+                raise ValueError(f"No route from {a!r} to {b!r}")
+            path.extend(matrix.path(a, b)[1:])
+        return order, path, self.compiled().distance(distance)
+
+    def warm_up(self, sources, cancel=None):
+        """Cache shortest-path trees for sources (most important first).
+
+        Sources already cached, or unknown, are skipped; at most
+        tree_cache.max_trees trees are built. Returns how many were built.
+        """
+        graph = self.compiled()
+        sources = [s for s in dict.fromkeys(sources) if s in graph.index][:self.tree_cache.max_trees]
+        built = 0
+        # least important first, so the most important trees end up most recently used
+        for source in reversed(sources):
+            if graph.index[source] not in self.tree_cache:
+                self.shortest_path_tree(source, cancel)
+                built += 1
+        return built
+
+    def shortest_path_tree(self, start, cancel=None, counters=None):
+        """Compute the full shortest-path tree from start and cache it."""
+        graph = self.compiled()
+        source = graph.index[start]
+        dist, pred = graph.shortest_path_tree(source, cancel=cancel, counters=counters)
+        tree = ShortestPathTree(source, dist, pred, self.version)
+        self.tree_cache.put(tree)
+        return tree
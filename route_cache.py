@@ -0,0 +1,82 @@
+# route_cache.py
+import threading
+from collections import OrderedDict
+
+
+class ShortestPathTree:
+    """Distances and predecessors from one source to every node."""
+
+    __slots__ = ("source", "dist", "pred", "version")
+
+    def __init__(self, source, dist, pred, version):
+        self.source = source
+        self.dist = dist
+        self.pred = pred
+        self.version = version
+
+
+class TreeCache:
+    """LRU cache of shortest-path trees keyed by source node id.
+
+    Trees remember the graph version they were computed for; a lookup with
+    a newer version discards them instead of returning stale routes.
+    """
+
+    def __init__(self, max_trees=16):
+        self.max_trees = max_trees
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._trees = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._trees)
+
+    def __contains__(self, source):
+        return source in self._trees
+
+    def get(self, source, version):
+        with self._lock:
+            tree = self._trees.get(source)
+            if tree is not None and tree.version != version:
+                del self._trees[source]
+                self.invalidations += 1
+                tree = None
+            if tree is None:
+                self.misses += 1
+                return None
+            self._trees.move_to_end(source)
+            self.hits += 1
+            return tree
+
+    def put(self, tree):
+        if self.max_trees <= 0:
+            return
+        with self._lock:
+            self._trees[tree.source] = tree
+            self._trees.move_to_end(tree.source)
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+                self.evictions += 1
+
+    def trees(self):
+        """Snapshot of the cached trees, least recently used first."""
+        with self._lock:
+            return list(self._trees.values())
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._trees)
+            self._trees.clear()
+
+    def stats(self):
+        return {
+            "trees": len(self._trees),
+            "max_trees": self.max_trees,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,158 @@
+# route_history.py
+import re
+import time
+from collections import namedtuple
+
+import numpy as np
+
+RouteRecord = namedtuple("RouteRecord", "timestamp start end distance seconds")
+
+# How a route appears in the History tab; parse_entry reverses it. A
+# numbered listbox row ("12. Path ...") parses too.
+ENTRY_FORMAT = "Path {start} -> {end}"
+_ENTRY_PATTERN = re.compile(r"(?:\d+\.\s+)?Path (.+?) -> (.+)")
+
+# Records kept in memory for analytics; the full history stays in the log
+MAX_RECORDS = 100_000
+
+_COLUMNS = (("timestamp", np.float64), ("start", np.int32), ("end", np.int32),
+            ("distance", np.float64), ("seconds", np.float64))
+
+
+def format_entry(start, end):
+    return ENTRY_FORMAT.format(start=start, end=end)
+
+
+def record_entry(record):
+    """History tab entry for a logged record."""
+    if isinstance(record, dict):
+        return format_entry(record["start"], record["end"])
+    return str(record)
+
+
+def parse_entry(text):
+    """(start, end) of a History tab entry, or None if text isn't one."""
+    match = _ENTRY_PATTERN.fullmatch(text.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+
+class RouteHistory:
+    """Routes taken, stored column-wise for vectorized analytics.
+
+    Each route is a timestamp, start and end location ids, distance and the
+    time it took to compute. Location names are interned in self.names. The
+    columns grow by doubling; with max_entries the oldest records are
+    dropped in bulk once twice that many are held.
+    """
+
+    def __init__(self, max_entries=MAX_RECORDS):
+        self.max_entries = max_entries
+        self.names = []
+        self._ids = {}
+        self._size = 0
+        self._columns = {name: np.empty(64, dtype) for name, dtype in _COLUMNS}
+
+    def __len__(self):
+        return self._size
+
+    def _location_id(self, name):
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def add(self, start, end, distance, seconds, timestamp=None):
+        if self._size == len(self._columns["timestamp"]):
+            self._reserve()
+        values = (time.time() if timestamp is None else timestamp,
+                  self._location_id(start), self._location_id(end), distance, seconds)
+        for (name, _), value in zip(_COLUMNS, values):
+            self._columns[name][self._size] = value
+        self._size += 1
+
+    def _reserve(self):
+        n = self._size
+        if self.max_entries and n >= 2 * self.max_entries:
+            drop = n - self.max_entries
+            for column in self._columns.values():
+                column[:n - drop] = column[drop:n]
+            self._size = n - drop
+            return
+        for name, column in self._columns.items():
+            grown = np.empty(2 * len(column), column.dtype)
+            grown[:n] = column[:n]
+            self._columns[name] = grown
+
+    def add_record(self, record):
+        """Add a record as stored by to_record (e.g. read back from a HistoryLog)."""
+        self.add(record["start"], record["end"], record["distance"], record["seconds"],
+                 record["timestamp"])
+
+    def to_record(self, i):
+        return self[i]._asdict()
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("route history index out of range")
+        c = self._columns
+        return RouteRecord(float(c["timestamp"][i]), self.names[c["start"][i]], self.names[c["end"][i]],
+                           float(c["distance"][i]), float(c["seconds"][i]))
+
+    def column(self, name):
+        """Read-only view of one column over the live records."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def entries(self, start=None, stop=None):
+        """History tab entries for records start..stop, oldest first."""
+        names = self.names
+        rows = slice(start, stop)
+        return [format_entry(names[s], names[e])
+                for s, e in zip(self.column("start")[rows], self.column("end")[rows])]
+
+    def clear(self):
+        self._size = 0
+
+    def _pair_keys(self):
+        return self.column("start").astype(np.int64) * max(len(self.names), 1) + self.column("end")
+
+    def _pair(self, key):
+        n = max(len(self.names), 1)
+        return self.names[key // n], self.names[key % n]
+
+    def top_pairs(self, k=10):
+        """The k most frequent routes as [(start, end, count)], most frequent first."""
+        keys, counts = np.unique(self._pair_keys(), return_counts=True)
+        # stable, so ties keep the smaller key first
+        order = np.argsort(-counts, kind="stable")[:k]
+        return [(*self._pair(int(keys[i])), int(counts[i])) for i in order]
+
+    def busiest_hours(self, k=24):
+        """Local hours of day with the most routes as [(hour, count)], busiest first."""
+        if not self._size:
+            return []
+        # UTC offsets (DST included) are whole quarter hours and change on
+        # quarter-hour boundaries, so one localtime() per quarter hour that
+        # has records gives every record its own local hour
+        quarters, inverse = np.unique(self.column("timestamp") // 900, return_inverse=True)
+        local = np.array([time.localtime(q * 900).tm_hour for q in quarters.tolist()], np.int64)
+        counts = np.bincount(local[inverse], minlength=24)
+        order = np.argsort(-counts, kind="stable")[:k]
+        return [(int(hour), int(counts[hour])) for hour in order if counts[hour]]
+
+    def mean_latency(self, k=None):
+        """Mean compute time per route as [(start, end, count, mean seconds)], slowest first."""
+        keys, inverse, counts = np.unique(self._pair_keys(), return_inverse=True, return_counts=True)
+        means = np.bincount(inverse, weights=self.column("seconds"), minlength=len(keys)) / np.maximum(counts, 1)
+        order = np.argsort(-means, kind="stable")[:k]
+        return [(*self._pair(int(keys[i])), int(counts[i]), float(means[i])) for i in order]
+
+    def popular_sources(self, k):
+        """Up to k locations routes most often start from, most popular first."""
+        counts = np.bincount(self.column("start"), minlength=len(self.names))
+        order = np.argsort(-counts, kind="stable")[:k]
+        return [self.names[i] for i in order if counts[i]]
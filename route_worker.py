@@ -0,0 +1,91 @@
+# route_worker.py
+import queue
+import threading
+import time
+
+from routing_graph import SearchCancelled
+
+# How often (ms) the Tk loop polls for finished jobs; ~60 fps
+POLL_INTERVAL = 16
+
+
+class RouteWorker:
+    """Runs routing jobs on a background thread for a Tk application.
+
+    Only the newest job matters: submitting a job sets the cancel event of
+    the one still in flight, which makes its search stop early. Results are
+    handed back to the Tk thread through root.after polling, so callbacks
+    may touch widgets freely.
+    """
+
+    def __init__(self, root, on_progress=None):
+        self.root = root
+        self.on_progress = on_progress
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._current = None
+        self._polling = False
+        self._thread = threading.Thread(target=self._run, name="route-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run func(*args, cancel=event) off the Tk thread.
+
+        on_done(result) or on_error(exception) is called on the Tk thread
+        unless a newer job was submitted in the meantime.
+        """
+        if self._current is not None:
+            self._current["cancel"].set()
+        job = {"func": func, "args": args, "cancel": threading.Event(),
+               "on_done": on_done, "on_error": on_error, "started": time.perf_counter()}
+        self._current = job
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL, self._poll)
+
+    def cancel(self):
+        """Cancel the job in flight, if any."""
+        if self._current is not None:
+            self._current["cancel"].set()
+            self._current = None
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job["cancel"].is_set():
+                continue
+            try:
+                result, error = job["func"](*job["args"], cancel=job["cancel"]), None
+            except SearchCancelled:
+                continue
+            except Exception as e:
+                result, error = None, e
+            self._results.put((job, result, error))
+
+    def _poll(self):
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            # Ignore results of jobs that were superseded while finishing
+            if job is not self._current:
+                continue
+            self._current = None
+            if error is not None:
+                if job["on_error"]:
+                    job["on_error"](error)
+            elif job["on_done"]:
+                job["on_done"](result)
+
+        if self._current is None:
+            self._polling = False
+            return
+        if self.on_progress:
+            self.on_progress(time.perf_counter() - self._current["started"])
+        self.root.after(POLL_INTERVAL, self._poll)
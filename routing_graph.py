@@ -0,0 +1,464 @@
+# routing_graph.py
+import hashlib
+import heapq
+import threading
+from array import array
+
+INF = float("inf")
+
+# Searches poll their cancel flag once per this many settled nodes
+CANCEL_CHECK_MASK = 1023
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search whose cancel event has been set."""
+
+
+def count_heap_ops(counters, settled, stale, queued):
+    """Add one search's heap traffic to an instrumentation counters dict.
+
+    Every pop either settles a node or skips a stale entry, and every push
+    is either popped or still queued, so searches only need to count the
+    stale skips themselves.
+    """
+    pops = settled + stale
+    counters["pops"] += pops
+    counters["pushes"] += pops + queued
+    counters["stale"] += stale
+
+
+class CompactGraph:
+    """Integer-indexed CSR (compressed sparse row) copy of a Navigation graph.
+
+    Node names are interned to ids 0..n-1 once; edges live in flat arrays
+    (offsets / targets / weights) for both directions, so searches never
+    hash strings. Distance and predecessor buffers are allocated once per
+    thread and only the entries a search touched are reset afterwards.
+    """
+
+    def __init__(self, graph):
+        names = list(graph)
+        index = {name: i for i, name in enumerate(names)}
+        for neighbors in graph.values():
+            for neighbor, _ in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = len(names)
+                    names.append(neighbor)
+        self.names = names
+        self.index = index
+        n = len(names)
+
+        all_weights = [w for neighbors in graph.values() for _, w in neighbors]
+        self.integral = all(isinstance(w, int) and 0 <= w < 2 ** 31 for w in all_weights)
+        wcode = "i" if self.integral else "d"
+
+        # Forward CSR
+        self.offsets = array("q", [0]) * (n + 1)
+        self.targets = array("i")
+        self.weights = array(wcode)
+        for i, name in enumerate(names):
+            for neighbor, weight in graph.get(name, ()):
+                self.targets.append(index[neighbor])
+                self.weights.append(weight)
+            self.offsets[i + 1] = len(self.targets)
+
+        # Reverse CSR (incoming edges), built by counting sort on the targets
+        counts = [0] * (n + 1)
+        for v in self.targets:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self.r_offsets = array("q", counts)
+        self.r_targets = array("i", [0]) * len(self.targets)
+        self.r_weights = array(wcode, [0]) * len(self.targets)
+        fill = counts[:n]
+        for u in range(n):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[e]
+                slot = fill[v]
+                self.r_targets[slot] = u
+                self.r_weights[slot] = self.weights[e]
+                fill[v] += 1
+
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Buffers are per-thread scratch space; ship only the arrays
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def nbytes(self):
+        """Bytes used by the edge and offset arrays (both directions)."""
+        arrays = (self.offsets, self.targets, self.weights,
+                  self.r_offsets, self.r_targets, self.r_weights)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def fingerprint(self):
+        """Stable hash of names and edges, used to validate on-disk caches."""
+        digest = hashlib.sha1()
+        digest.update("\0".join(map(str, self.names)).encode("utf-8"))
+        for a in (self.offsets, self.targets, self.weights):
+            digest.update(a.tobytes())
+        return digest.hexdigest()
+
+    def set_weight(self, u, v, weight):
+        """Change the weight of every u -> v edge in place (INF closes it).
+
+        Returns the previous weight, or None if there is no such edge.
+        """
+        if self.weights.typecode == "i" and not (isinstance(weight, int) and 0 <= weight < 2 ** 31):
+            self.weights = array("d", self.weights)
+            self.r_weights = array("d", self.r_weights)
+        if weight != INF and not isinstance(weight, int):
+            self.integral = False
+        old = None
+        for e in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[e] == v:
+                old = self.weights[e] if old is None else min(old, self.weights[e])
+                self.weights[e] = weight
+        for e in range(self.r_offsets[v], self.r_offsets[v + 1]):
+            if self.r_targets[e] == u:
+                self.r_weights[e] = weight
+        return old
+
+    def _buffers(self, count=1):
+        """Return `count` (dist, pred) buffer pairs owned by this thread."""
+        local = self._local
+        pool = getattr(local, "pool", None)
+        if pool is None:
+            pool = local.pool = []
+        n = len(self.names)
+        while len(pool) < count:
+            pool.append(([INF] * n, [-1] * n))
+        return pool[:count]
+
+    def distance(self, value):
+        """Convert a search distance back to the graph's weight type."""
+        if self.integral and value != INF:
+            return int(value)
+        return value
+
+    def path_ids(self, pred, source, target):
+        """Rebuild the source -> target id path from a predecessor array."""
+        if source == target:
+            return []
+        path = []
+        node = target
+        while node != -1 and node != source:
+            path.append(node)
+            node = pred[node]
+        if node != source:
+            return []
+        path.append(source)
+        path.reverse()
+        return path
+
+    def dijkstra(self, source, target, cancel=None, counters=None):
+        """One-directional Dijkstra from source, stopping once target settles.
+
+        Returns (path_ids, distance, settled).
+        """
+        (dist, pred), = self._buffers(1)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heappush, heappop = heapq.heappush, heapq.heappop
+        touched = [source]
+        dist[source] = 0
+        pq = [(0, source)]
+        settled = stale = 0
+        try:
+            while pq:
+                d, u = heappop(pq)
+                if d > dist[u]:
+                    stale += 1
+                    continue
+                settled += 1
+                if cancel is not None and not settled & CANCEL_CHECK_MASK and cancel.is_set():
+                    raise SearchCancelled()
+                if u == target:
+                    break
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    nd = d + weights[e]
+                    if nd < dist[v]:
+                        if dist[v] == INF:
+                            touched.append(v)
+                        dist[v] = nd
+                        pred[v] = u
+                        heappush(pq, (nd, v))
+            if counters is not None:
+                count_heap_ops(counters, settled, stale, len(pq))
+            return self.path_ids(pred, source, target), self.distance(dist[target]), settled
+        finally:
+            for v in touched:
+                dist[v] = INF
+                pred[v] = -1
+
+    def bidirectional(self, source, target, cancel=None, counters=None):
+        """Bidirectional Dijkstra that stops once the frontiers meet.
+
+        Returns (path_ids, distance, settled).
+        """
+        (dist_f, pred_f), (dist_b, pred_b) = self._buffers(2)
+        sides = (
+            (dist_f, pred_f, dist_b, self.offsets, self.targets, self.weights),
+            (dist_b, pred_b, dist_f, self.r_offsets, self.r_targets, self.r_weights),
+        )
+        heappush, heappop = heapq.heappush, heapq.heappop
+        touched_f, touched_b = [source], [target]
+        dist_f[source] = 0
+        dist_b[target] = 0
+        queues = ([(0, source)], [(0, target)])
+        touched = (touched_f, touched_b)
+        best, meet = (0, source) if source == target else (INF, -1)
+        settled = stale = 0
+        try:
+            pq_f, pq_b = queues
+            while pq_f and pq_b:
+                # Once the two frontiers together cannot beat the best meeting
+                # point found so far, that path is settled.
+                if pq_f[0][0] + pq_b[0][0] >= best:
+                    break
+                side = 0 if pq_f[0][0] <= pq_b[0][0] else 1
+                dist, pred, other, offsets, targets, weights = sides[side]
+                pq, seen = queues[side], touched[side]
+
+                d, u = heappop(pq)
+                if d > dist[u]:
+                    stale += 1
+                    continue
+                settled += 1
+                if cancel is not None and not settled & CANCEL_CHECK_MASK and cancel.is_set():
+                    raise SearchCancelled()
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    nd = d + weights[e]
+                    if nd < dist[v]:
+                        if dist[v] == INF:
+                            seen.append(v)
+                        dist[v] = nd
+                        pred[v] = u
+                        heappush(pq, (nd, v))
+                    if nd + other[v] < best:
+                        best, meet = nd + other[v], v
+
+            if counters is not None:
+                count_heap_ops(counters, settled, stale, len(pq_f) + len(pq_b))
+            if meet == -1 or source == target:
+                return [], self.distance(best), settled
+            # start..meet from the forward tree, meet..target from the backward one
+            path = self.path_ids(pred_f, source, meet) or [source]
+            node = meet
+            while node != target:
+                node = pred_b[node]
+                path.append(node)
+            return path, self.distance(best), settled
+        finally:
+            for dist, pred, seen in ((dist_f, pred_f, touched_f), (dist_b, pred_b, touched_b)):
+                for v in seen:
+                    dist[v] = INF
+                    pred[v] = -1
+
+    def astar(self, source, target, heuristic, cancel=None, counters=None):
+        """A* search; heuristic(v) must never overestimate the distance v -> target.
+
+        Returns (path_ids, distance, settled).
+        """
+        (dist, pred), = self._buffers(1)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heappush, heappop = heapq.heappush, heapq.heappop
+        touched = [source]
+        dist[source] = 0
+        pq = [(heuristic(source), 0, source)]
+        settled = stale = 0
+        try:
+            while pq:
+                _, d, u = heappop(pq)
+                if d > dist[u]:
+                    stale += 1
+                    continue
+                settled += 1
+                if cancel is not None and not settled & CANCEL_CHECK_MASK and cancel.is_set():
+                    raise SearchCancelled()
+                if u == target:
+                    break
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    nd = d + weights[e]
+                    if nd < dist[v]:
+                        if dist[v] == INF:
+                            touched.append(v)
+                        dist[v] = nd
+                        pred[v] = u
+                        heappush(pq, (nd + heuristic(v), nd, v))
+            if counters is not None:
+                count_heap_ops(counters, settled, stale, len(pq))
+            return self.path_ids(pred, source, target), self.distance(dist[target]), settled
+        finally:
+            for v in touched:
+                dist[v] = INF
+                pred[v] = -1
+
+    def shortest_path_tree(self, source, reverse=False, targets=None, cancel=None, counters=None):
+        """Dijkstra from source (towards source when reverse=True).
+
+        source may also be a list of ids, giving a multi-source forest.
+        With targets given the search stops once all of them are settled.
+        Returns fresh (dist, pred) lists indexed by node id.
+        """
+        n = len(self.names)
+        dist, pred = [INF] * n, [-1] * n
+        if reverse:
+            offsets, targets_, weights = self.r_offsets, self.r_targets, self.r_weights
+        else:
+            offsets, targets_, weights = self.offsets, self.targets, self.weights
+        remaining = set(targets) if targets is not None else None
+        heappush, heappop = heapq.heappush, heapq.heappop
+        sources = source if isinstance(source, (list, tuple, set)) else (source,)
+        for s in sources:
+            dist[s] = 0
+        pq = [(0, s) for s in sources]
+        settled = stale = 0
+        while pq:
+            d, u = heappop(pq)
+            if d > dist[u]:
+                stale += 1
+                continue
+            settled += 1
+            if cancel is not None and not settled & CANCEL_CHECK_MASK and cancel.is_set():
+                raise SearchCancelled()
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets_[e]
+                nd = d + weights[e]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    heappush(pq, (nd, v))
+        if counters is not None:
+            count_heap_ops(counters, settled, stale, len(pq))
+        return dist, pred
+
+    def repair_tree(self, dist, pred, u, v, old, new, reverse=False):
+        """Bring a full shortest-path tree up to date after edge u -> v
+        changed weight from old to new.
+
+        Only the part of the tree the change can affect is recomputed: the
+        subtree below v when a tree edge got longer, or the region that v
+        now reaches more cheaply when the edge got shorter. For trees grown
+        over the reverse graph pass reverse=True and the edge as it appears
+        there (v -> u). Returns the number of nodes relabelled.
+        """
+        if reverse:
+            offsets, targets, weights = self.r_offsets, self.r_targets, self.r_weights
+            in_offsets, in_targets, in_weights = self.offsets, self.targets, self.weights
+        else:
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+            in_offsets, in_targets, in_weights = self.r_offsets, self.r_targets, self.r_weights
+
+        if new < old:
+            nd = dist[u] + new
+            if nd >= dist[v]:
+                return 0
+            dist[v] = nd
+            pred[v] = u
+            pq = [(nd, v)]
+            changed = 1
+        else:
+            if pred[v] != u:
+                return 0
+            # Collect the subtree hanging below v and detach it
+            children = {}
+            for x, parent in enumerate(pred):
+                if parent != -1:
+                    children.setdefault(parent, []).append(x)
+            subtree = [v]
+            for x in subtree:
+                subtree.extend(children.get(x, ()))
+            for x in subtree:
+                dist[x] = INF
+                pred[x] = -1
+            # Re-attach each node through its best edge from outside the subtree
+            pq = []
+            for x in subtree:
+                best, via = INF, -1
+                for e in range(in_offsets[x], in_offsets[x + 1]):
+                    y = in_targets[e]
+                    if dist[y] + in_weights[e] < best:
+                        best, via = dist[y] + in_weights[e], y
+                if via != -1:
+                    dist[x] = best
+                    pred[x] = via
+                    pq.append((best, x))
+            heapq.heapify(pq)
+            changed = len(subtree)
+
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while pq:
+            d, x = heappop(pq)
+            if d > dist[x]:
+                continue
+            for e in range(offsets[x], offsets[x + 1]):
+                y = targets[e]
+                nd = d + weights[e]
+                if nd < dist[y]:
+                    dist[y] = nd
+                    pred[y] = x
+                    heappush(pq, (nd, y))
+                    if new < old:
+                        changed += 1
+        return changed
+
+    def bounded(self, sources, budget, nearest=False):
+        """Multi-source Dijkstra that stops at distance budget.
+
+        Only nodes within the budget (and their frontier edges) are
+        examined. Returns {node_id: distance to the nearest source}, or with
+        nearest=True {node_id: (distance, nearest source id)}.
+        """
+        (dist, pred), = self._buffers(1)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        heappush, heappop = heapq.heappush, heapq.heappop
+        touched = list(sources)
+        # pred holds the source each node was reached from
+        for s in sources:
+            dist[s] = 0
+            pred[s] = s
+        pq = [(0, s) for s in sources]
+        reached = {}
+        try:
+            while pq:
+                d, u = heappop(pq)
+                if d > budget:
+                    break
+                if d > dist[u]:
+                    continue
+                reached[u] = (d, pred[u]) if nearest else d
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    nd = d + weights[e]
+                    if nd <= budget and nd < dist[v]:
+                        if dist[v] == INF:
+                            touched.append(v)
+                        dist[v] = nd
+                        pred[v] = pred[u]
+                        heappush(pq, (nd, v))
+            return reached
+        finally:
+            for v in touched:
+                dist[v] = INF
+                pred[v] = -1
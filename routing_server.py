@@ -0,0 +1,321 @@
+# routing_server.py
+"""Headless HTTP/JSON routing service.
+
+    python routing_server.py --port 8765
+
+Endpoints (all JSON):
+  GET  /route?start=A&end=B[&method=dijkstra]
+  POST /matrix     {"sources": [...], "targets": [...]}
+  GET  /nearest?kind=Medical Center&from=A
+  GET  /stats      latency histograms, cache and query counters
+  GET  /health
+"""
+import argparse
+import json
+import math
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from facilities import EMERGENCY_FACILITIES
+from instrumentation import LatencyHistogram
+from navigation import Navigation
+
+
+class ResponseCache:
+    """Small LRU of encoded responses, keyed together with the graph version."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RoutingServer(HTTPServer):
+    """HTTP server that hands each connection to a fixed worker pool.
+
+    A kept-alive connection holds its worker until it closes or sits idle
+    for KEEPALIVE_TIMEOUT seconds, so size the pool for the expected number
+    of concurrent clients.
+    """
+
+    def __init__(self, address, nav, workers=8, cache_size=1024):
+        super().__init__(address, RoutingHandler)
+        self.nav = nav
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="routing")
+        self.cache = ResponseCache(cache_size)
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+        # The routing engine itself is not re-entrant
+        self.engine_lock = threading.Lock()
+        self._connections = set()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        self._connections.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self._connections.discard(request)
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        # Wake workers blocked on idle keep-alive connections
+        for request in list(self._connections):
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.pool.shutdown(wait=True)
+
+    def histogram(self, endpoint):
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self._histograms_lock:
+                histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        return histogram
+
+    def latency_summaries(self):
+        with self._histograms_lock:
+            histograms = dict(self.histograms)
+        return {name: h.summary() for name, h in histograms.items()}
+
+
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 15
+# Larger request bodies are refused
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class RoutingHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body are written separately; don't let Nagle delay them
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        endpoint = url.path.rstrip("/") or "/"
+        handler = {
+            "/route": self._route,
+            "/matrix": self._matrix,
+            "/nearest": self._nearest,
+            "/stats": self._stats,
+            "/health": self._health,
+        }.get(endpoint)
+        try:
+            length = _content_length(self.headers.get("Content-Length"))
+        except ValueError as e:
+            # The body can't be skipped, so the connection can't be reused
+            self.close_connection = True
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            body = self.rfile.read(length) if length else b""
+            if handler is None:
+                status, payload = 404, {"error": f"Unknown endpoint {endpoint}"}
+            else:
+                status, payload = handler(parse_qs(url.query), body)
+        except (ValueError, KeyError) as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            # Always answer, so a bug doesn't leave the client hanging
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, payload)
+        if handler is not None:
+            self.server.histogram(endpoint).record((time.perf_counter() - started) * 1000)
+
+    def _send(self, status, payload):
+        data = payload if isinstance(payload, bytes) else _encode(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _cached(self, key, compute):
+        server = self.server
+        key = (key, server.nav.version)
+        data = server.cache.get(key)
+        if data is None:
+            with server.engine_lock:
+                payload = compute()
+            data = _encode(payload)
+            server.cache.put(key, data)
+        return 200, data
+
+    # ---------------- Endpoints ----------------
+    def _route(self, query, body):
+        nav = self.server.nav
+        start, end = _location(nav, query, "start"), _location(nav, query, "end")
+        method = query.get("method", ["dijkstra"])[0]
+
+        def compute():
+            path, distance = nav.shortest_path(start, end, method=method)
+            return {"start": start, "end": end, "path": path, "distance": distance}
+
+        return self._cached(("route", start, end, method), compute)
+
+    def _matrix(self, query, body):
+        request = json.loads(body or b"{}")
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        sources, targets = _names(request, "sources"), _names(request, "targets")
+        nav = self.server.nav
+
+        def compute():
+            matrix = nav.distance_matrix(sources, targets, workers=1)
+            return {"sources": sources, "targets": targets,
+                    "distances": matrix.distances.tolist()}
+
+        return self._cached(("matrix", tuple(sources), tuple(targets)), compute)
+
+    def _nearest(self, query, body):
+        nav = self.server.nav
+        kind, location = _param(query, "kind"), _location(nav, query, "from")
+        if kind not in nav.facilities:
+            raise ValueError(f"Unknown facility kind: {kind!r}")
+
+        def compute():
+            facility, path, distance = nav.nearest_facility(kind, location)
+            return {"kind": kind, "from": location, "facility": facility,
+                    "path": path, "distance": distance}
+
+        return self._cached(("nearest", kind, location), compute)
+
+    def _stats(self, query, body):
+        server = self.server
+        return 200, {
+            "endpoints": server.latency_summaries(),
+            "response_cache": {"hits": server.cache.hits, "misses": server.cache.misses},
+            "tree_cache": server.nav.cache_stats(),
+            "graph_version": server.nav.version,
+            "queries": server.nav.query_stats.summary() if server.nav.query_stats else None,
+        }
+
+    def _health(self, query, body):
+        return 200, {"status": "ok", "nodes": len(self.server.nav.graph)}
+
+
+def _content_length(header):
+    """The request body length announced by a Content-Length header."""
+    if not header:
+        return 0
+    try:
+        length = int(header)
+    except ValueError:
+        raise ValueError(f"Invalid Content-Length: {header!r}") from None
+    if not 0 <= length <= MAX_BODY_BYTES:
+        raise ValueError(f"Content-Length must be between 0 and {MAX_BODY_BYTES}")
+    return length
+
+
+def _param(query, name):
+    values = query.get(name)
+    if not values:
+        raise ValueError(f"Missing parameter: {name}")
+    return values[0]
+
+
+def _location(nav, query, name):
+    """Query parameter name, which must be a location in nav's graph."""
+    value = _param(query, name)
+    if value not in nav.graph:
+        raise ValueError(f"Unknown location: {value!r}")
+    return value
+
+
+def _names(request, field):
+    """request[field] as a list of location names."""
+    if field not in request:
+        raise ValueError(f"Missing field: {field}")
+    names = request[field]
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError(f"{field} must be a list of location names")
+    return names
+
+
+def _encode(payload):
+    # JSON has no infinity; unreachable distances become null
+    def clean(value):
+        if isinstance(value, float) and math.isinf(value):
+            return None
+        if isinstance(value, list):
+            return [clean(v) for v in value]
+        if isinstance(value, dict):
+            return {k: clean(v) for k, v in value.items()}
+        return value
+
+    return json.dumps(clean(payload)).encode("utf-8")
+
+
+def serve(nav=None, host="127.0.0.1", port=8765, workers=8, cache_size=1024):
+    """Create a RoutingServer bound to host:port (port 0 picks a free one)."""
+    if nav is None:
+        nav = Navigation()
+        for kind, locations in EMERGENCY_FACILITIES.items():
+            nav.set_facilities(kind, locations)
+    return RoutingServer((host, port), nav, workers, cache_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve campus routing over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--instrument", action="store_true", help="collect per-query routing statistics")
+    args = parser.parse_args()
+
+    server = serve(host=args.host, port=args.port, workers=args.workers, cache_size=args.cache_size)
+    if args.instrument:
+        server.nav.enable_instrumentation()
+    print(f"Routing service on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# spatial_index.py
+import numpy as np
+
+
+class GridIndex:
+    """Uniform-grid bucket index over 2-D points.
+
+    Point ids are sorted by cell into one array with per-cell offsets (the
+    same CSR layout CompactGraph uses for edges), so a box query only
+    touches the rows of cells it overlaps.
+    """
+
+    def __init__(self, xy, points_per_cell=8):
+        self.xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        n = len(self.xy)
+        self.side = max(1, int(np.sqrt(n / points_per_cell)))
+        if n:
+            self.lo = self.xy.min(axis=0)
+            self.hi = self.xy.max(axis=0)
+        else:
+            self.lo = self.hi = np.zeros(2)
+        self.cell_size = np.maximum((self.hi - self.lo) / self.side, 1e-12)
+        cells = self.cell_of(self.xy)
+        self.order = np.argsort(cells, kind="stable")
+        self.offsets = np.searchsorted(cells[self.order], np.arange(self.side * self.side + 1))
+
+    def __len__(self):
+        return len(self.xy)
+
+    def cell_of(self, xy):
+        """Flat cell number of each point, clipped to the grid."""
+        c = np.clip(((xy - self.lo) / self.cell_size).astype(np.int64), 0, self.side - 1)
+        return c[:, 1] * self.side + c[:, 0]
+
+    def _cell_box(self, x0, y0, x1, y1):
+        lo = np.floor((np.array([x0, y0]) - self.lo) / self.cell_size).astype(np.int64)
+        hi = np.floor((np.array([x1, y1]) - self.lo) / self.cell_size).astype(np.int64)
+        if (hi < 0).any() or (lo >= self.side).any():
+            return None
+        lo = np.clip(lo, 0, self.side - 1)
+        hi = np.clip(hi, 0, self.side - 1)
+        return lo[0], lo[1], hi[0], hi[1]
+
+    def count(self, x0, y0, x1, y1):
+        """Upper bound on the points inside the box (whole overlapped cells)."""
+        box = self._cell_box(x0, y0, x1, y1)
+        if box is None:
+            return 0
+        cx0, cy0, cx1, cy1 = box
+        rows = np.arange(cy0, cy1 + 1) * self.side
+        return int((self.offsets[rows + cx1 + 1] - self.offsets[rows + cx0]).sum())
+
+    def query(self, x0, y0, x1, y1):
+        """Ids of the points with x0 <= x <= x1 and y0 <= y <= y1."""
+        box = self._cell_box(x0, y0, x1, y1)
+        if box is None:
+            return np.empty(0, dtype=np.int64)
+        cx0, cy0, cx1, cy1 = box
+        # cells cx0..cx1 of one row are contiguous in the sorted order
+        ids = np.concatenate([self.order[self.offsets[row * self.side + cx0]:
+                                         self.offsets[row * self.side + cx1 + 1]]
+                              for row in range(cy0, cy1 + 1)])
+        x, y = self.xy[ids, 0], self.xy[ids, 1]
+        return ids[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+
+class ClusterLevel:
+    """Points and edges aggregated into the cells of a side x side grid.
+
+    Holds one centroid and point count per occupied cell, plus the links
+    between cells with the number of edges each one stands for.
+    """
+
+    def __init__(self, xy, lo, hi, side, edges_u, edges_v):
+        size = np.maximum((hi - lo) / side, 1e-12)
+        c = np.clip(((xy - lo) / size).astype(np.int64), 0, side - 1)
+        cells = c[:, 1] * side + c[:, 0]
+        counts = np.bincount(cells, minlength=side * side)
+        sum_x = np.bincount(cells, weights=xy[:, 0], minlength=side * side)
+        sum_y = np.bincount(cells, weights=xy[:, 1], minlength=side * side)
+        occupied = np.flatnonzero(counts)
+        self.side = side
+        self.counts = counts[occupied]
+        self.xy = np.column_stack((sum_x[occupied], sum_y[occupied])) / self.counts[:, None]
+
+        remap = np.full(side * side, -1, dtype=np.int64)
+        remap[occupied] = np.arange(len(occupied))
+        cu, cv = remap[cells[edges_u]], remap[cells[edges_v]]
+        between = cu != cv
+        a = np.minimum(cu[between], cv[between])
+        b = np.maximum(cu[between], cv[between])
+        links, link_counts = np.unique(a * len(occupied) + b, return_counts=True)
+        self.links_u = links // len(occupied)
+        self.links_v = links % len(occupied)
+        self.link_counts = link_counts
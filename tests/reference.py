@@ -0,0 +1,73 @@
+# tests/reference.py
+"""Random campus graphs and plain Dijkstra to check the routing engines against."""
+import heapq
+import math
+import random
+
+import pytest
+
+
+def random_campus(seed, size=40, extra=40, one_way=0.2, floats=False):
+    """Random connected-ish graph in Navigation's format, with coordinates.
+
+    Every edge is at least as long as the straight line between its ends,
+    so the coordinates are valid for A*. Some edges are one-way and some
+    nodes may be unreachable. Returns (graph, coordinates).
+    """
+    rng = random.Random(seed)
+    names = [f"P{i}" for i in range(size)]
+    coordinates = {name: (rng.uniform(0, 500), rng.uniform(0, 500)) for name in names}
+    graph = {name: [] for name in names}
+
+    def link(a, b):
+        length = math.dist(coordinates[a], coordinates[b]) + rng.uniform(0, 30)
+        weight = round(length, 1) + 0.5 if floats else math.ceil(length) + 1
+        graph[a].append((b, weight))
+        if rng.random() >= one_way:
+            graph[b].append((a, weight))
+
+    for i in range(1, size):
+        link(names[i], names[rng.randrange(i)])
+    for _ in range(extra):
+        a, b = rng.sample(names, 2)
+        link(a, b)
+    return graph, coordinates
+
+
+def dijkstra(graph, source):
+    """{node: distance} for every node reachable from source."""
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v, w in graph.get(u, ()):
+            if d + w < dist.get(v, math.inf):
+                dist[v] = d + w
+                heapq.heappush(heap, (d + w, v))
+    return dist
+
+
+def path_length(graph, path):
+    """Length of path over graph's edges; fails if a hop is not an edge."""
+    total = 0
+    for a, b in zip(path, path[1:]):
+        weights = [w for neighbor, w in graph[a] if neighbor == b]
+        assert weights, f"{a} -> {b} is not an edge"
+        total += min(weights)
+    return total
+
+
+def check_route(graph, start, end, path, distance):
+    """Assert (path, distance) is a shortest start -> end route of graph."""
+    expected = dijkstra(graph, start).get(end, math.inf)
+    if expected == math.inf:
+        assert distance == math.inf and not path
+        return
+    assert distance == pytest.approx(expected, abs=1e-6)
+    if start == end:
+        return
+    assert path[0] == start and path[-1] == end
+    assert path_length(graph, path) == pytest.approx(expected, abs=1e-6)
+
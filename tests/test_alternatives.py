@@ -0,0 +1,57 @@
+# tests/test_alternatives.py
+import random
+
+import pytest
+
+from navigation import Navigation
+from reference import path_length, random_campus
+
+
+def simple_path_lengths(graph, start, end):
+    """Lengths of every loopless start -> end node sequence, shortest first."""
+    paths = set()
+    stack = [(start, (start,))]
+    while stack:
+        node, path = stack.pop()
+        if node == end:
+            paths.add(path)
+            continue
+        for neighbor, _ in graph[node]:
+            if neighbor not in path:
+                stack.append((neighbor, path + (neighbor,)))
+    return sorted(path_length(graph, list(path)) for path in paths)
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("floats", [False, True])
+def test_k_shortest_match_enumeration(seed, floats):
+    rng = random.Random(seed)
+    graph, _ = random_campus(seed, size=9, extra=9, floats=floats)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    for _ in range(10):
+        start, end = rng.sample(list(graph), 2)
+        routes = nav.alternative_routes(start, end, k=5)
+        expected = simple_path_lengths(graph, start, end)[:5]
+        assert [distance for _, distance in routes] == pytest.approx(expected)
+        assert len({tuple(path) for path, _ in routes}) == len(routes)
+        for path, distance in routes:
+            assert path[0] == start and path[-1] == end
+            assert len(set(path)) == len(path)
+            assert path_length(graph, path) == pytest.approx(distance)
+
+
+def test_overlap_limit_drops_similar_routes():
+    graph, _ = random_campus(5, size=30, extra=30)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    checked = 0
+    for start, end in random.Random(5).sample([(a, b) for a in graph for b in graph if a != b], 40):
+        routes = nav.alternative_routes(start, end, k=4, max_overlap=0.5)
+        checked += len(routes) > 1
+        for i, (path, _) in enumerate(routes):
+            edges = set(zip(path, path[1:]))
+            for earlier, _ in routes[:i]:
+                shared = sum(path_length(graph, edge) for edge in zip(earlier, earlier[1:]) if edge in edges)
+                assert shared <= 0.5 * path_length(graph, path)
+    assert checked
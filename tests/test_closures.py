@@ -0,0 +1,66 @@
+# tests/test_closures.py
+import random
+
+import pytest
+
+from navigation import Navigation
+from reference import check_route, dijkstra, random_campus
+
+
+def test_contraction_after_closure():
+    nav = Navigation(max_cached_trees=0)
+    assert nav.shortest_path("Main Gate", "Canteen", method="ch") == (["Main Gate", "Library", "Canteen"], 300)
+
+    nav.close_edge("Main Gate", "Library")
+    path, distance = nav.shortest_path("Main Gate", "Canteen", method="ch")
+    assert (path, distance) == nav.shortest_path("Main Gate", "Canteen")
+    assert path[:2] == ["Main Gate", "Admin Block"]
+
+    nav.reopen_edge("Main Gate", "Library")
+    assert nav.shortest_path("Main Gate", "Canteen", method="ch") == (["Main Gate", "Library", "Canteen"], 300)
+
+
+def random_change(nav, rng, float_weights):
+    """Close, reopen or reweight one random edge of nav's graph."""
+    if nav.closed and rng.random() < 0.3:
+        u, v = rng.choice(sorted(nav.closed))
+        nav.reopen_edge(u, v, both_ways=False)
+        return
+    u = rng.choice([name for name, neighbors in nav.graph.items() if neighbors])
+    v, weight = rng.choice(nav.graph[u])
+    if rng.random() < 0.4:
+        nav.close_edge(u, v, both_ways=False)
+    else:
+        factor = rng.uniform(0.3, 2.5)
+        weight = round(weight * factor, 2) if float_weights else max(int(weight * factor), 1)
+        nav.set_edge_weight(u, v, weight, both_ways=False)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("float_weights", [False, True])
+def test_repaired_trees_match_plain_dijkstra(seed, float_weights):
+    rng = random.Random(seed)
+    graph, _ = random_campus(seed)
+    nav = Navigation(max_cached_trees=len(graph))
+    nav.graph = graph
+    facilities = rng.sample(list(graph), 3)
+    nav.set_facilities("Clinic", facilities)
+    sources = rng.sample(list(graph), 10)
+    nav.warm_up(sources)
+
+    for _ in range(30):
+        random_change(nav, rng, float_weights)
+        # every change is repaired in place, never answered by a rebuild
+        assert nav.last_repair["trees"] == len(sources)
+        for start in sources:
+            for end in rng.sample(list(graph), 5):
+                check_route(graph, start, end, *nav.shortest_path(start, end))
+        assert len(nav.tree_cache) == len(sources)
+
+        location = rng.choice(list(graph))
+        reach = dijkstra(graph, location)
+        expected = min((reach.get(f, float("inf")) for f in facilities))
+        facility, path, distance = nav.nearest_facility("Clinic", location)
+        assert distance == pytest.approx(expected)
+        if path:
+            check_route(graph, location, facility, path, distance)
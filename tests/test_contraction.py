@@ -0,0 +1,36 @@
+# tests/test_contraction.py
+import itertools
+
+import pytest
+
+from navigation import Navigation
+from reference import check_route, random_campus
+from test_routing import random_pairs
+
+
+@pytest.mark.parametrize("seed, floats", list(itertools.product(range(8), (False, True))))
+def test_matches_plain_dijkstra(seed, floats):
+    graph, _ = random_campus(seed, size=60, extra=80, floats=floats)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    for start, end in random_pairs(graph, 60, seed):
+        check_route(graph, start, end, *nav.shortest_path(start, end, method="ch"))
+
+
+@pytest.mark.parametrize("floats", [False, True])
+def test_hierarchy_round_trip(tmp_path, floats):
+    graph, _ = random_campus(3, size=60, extra=80, floats=floats)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    filename = str(tmp_path / "hierarchy.bin")
+    built = nav.prepare_contraction(filename)
+    loaded = nav.prepare_contraction(filename)
+    assert loaded is not built
+    assert loaded.shortcut_count == built.shortcut_count
+    for start, end in random_pairs(graph, 40, 3):
+        check_route(graph, start, end, *nav.shortest_path(start, end, method="ch"))
+
+    graph["P0"].append(("P1", 1))
+    nav.graph_changed()
+    # a hierarchy saved for another graph is rebuilt, not reused
+    assert nav.prepare_contraction(filename).fingerprint == nav.compiled().fingerprint()
@@ -0,0 +1,71 @@
+# tests/test_history.py
+import random
+import re
+
+import pytest
+
+from history import IndexedHistory, RingHistory
+
+WORDS = ["Main Gate", "Library", "Canteen", "Hostel", "IT Faculty", "Science Faculty",
+         "Admin Block", "Auditorium", "Lab-2", "Café", "gate"]
+
+
+def naive_search(entries, query, mode):
+    q = query.lower()
+    if mode == "substring":
+        return [e for e in entries if q in e.lower()]
+    words = set(re.findall(r"\w+", q))
+    if not words:
+        return []
+    found = []
+    for e in entries:
+        tokens = set(re.findall(r"\w+", e.lower()))
+        if mode == "word" and words <= tokens:
+            found.append(e)
+        elif mode == "prefix" and all(any(t.startswith(w) for t in tokens) for w in words):
+            found.append(e)
+    return found
+
+
+def random_query(rng, entries):
+    kind = rng.randrange(4)
+    if kind == 0 and entries:
+        entry = rng.choice(entries)
+        i = rng.randrange(len(entry))
+        return entry[i:i + rng.randint(1, 12)]
+    if kind == 1:
+        return rng.choice(WORDS)
+    if kind == 2:
+        word = rng.choice(WORDS)
+        return word[:rng.randint(1, len(word))]
+    return rng.choice(["zzz", "gate lib", "path", "2", "fac gate", "ga"])
+
+
+def test_ring_history_keeps_the_newest_entries():
+    history = RingHistory(max_entries=5)
+    for i in range(12):
+        history.add(f"Path {i}")
+    assert history.get_all() == [f"Path {i}" for i in range(7, 12)]
+    assert list(reversed(history)) == [f"Path {i}" for i in range(11, 6, -1)]
+    assert list(history.view(1, 3)) == ["Path 8", "Path 9"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_entries", [None, 40])
+def test_indexed_search_matches_scan(seed, max_entries):
+    rng = random.Random(seed)
+    history = IndexedHistory(max_entries)
+    for step in range(600):
+        history.add(f"Path {rng.choice(WORDS)} -> {rng.choice(WORDS)}")
+        if step == 300:
+            history.clear()
+        if step % 40 == 0:
+            entries = history.get_all()
+            for _ in range(10):
+                query = random_query(rng, entries)
+                for mode in ("substring", "word", "prefix"):
+                    assert history.search(query, mode) == naive_search(entries, query, mode), (query, mode)
+    stats = history.index.stats()
+    assert stats["documents"] == len(history)
+    # dead postings are trimmed once they make up half of the index
+    assert stats["dead_postings"] <= stats["postings"]
@@ -0,0 +1,80 @@
+# tests/test_history_log.py
+import json
+
+import pytest
+
+from history_log import HistoryLog
+
+
+def record(i):
+    return {"i": i, "start": "Main Gate", "end": f"Room {i}"}
+
+
+def open_log(tmp_path, **options):
+    return HistoryLog(str(tmp_path / "history.log"), **options)
+
+
+@pytest.mark.parametrize("count", [0, 1, 150, 1000])
+def test_round_trip_across_rotations(tmp_path, count):
+    with open_log(tmp_path, max_bytes=2048, backup_count=100, max_records=None) as log:
+        for i in range(count):
+            log.append(record(i))
+        assert (len(log.segments()) > 1) == (count >= 150)
+        assert [r["i"] for chunk in log.chunks(64) for r in chunk] == list(range(count))
+        assert all(len(chunk) <= 64 for chunk in log.chunks(64))
+        for n in (0, 1, 7, 64, count, count + 5):
+            assert [r["i"] for r in log.tail(n)] == list(range(max(count - n, 0), count))
+
+    # reopened, the same records come back
+    with open_log(tmp_path, max_bytes=2048, backup_count=100, max_records=None) as log:
+        assert [r["i"] for r in log.tail(count + 1)] == list(range(count))
+        exported = tmp_path / "export.txt"
+        assert log.export(str(exported), formatter=lambda r: str(r["i"]), chunk_size=10) == count
+        assert exported.read_text().split() == [str(i) for i in range(count)]
+
+
+def test_rotation_drops_segments_beyond_backup_count(tmp_path):
+    with open_log(tmp_path, max_bytes=1024, backup_count=2, max_records=None) as log:
+        for i in range(500):
+            log.append(record(i))
+        assert len(log.segments()) == 3
+        kept = [r["i"] for chunk in log.chunks() for r in chunk]
+        assert kept == list(range(500 - len(kept), 500))
+
+
+def test_rotation_compacts_to_max_records(tmp_path):
+    with open_log(tmp_path, max_bytes=1024, backup_count=50, max_records=40, compact_ratio=1.5) as log:
+        per_segment = 1024 // len(json.dumps(record(1999))) + 1
+        for i in range(2000):
+            log.append(record(i))
+            held = [r["i"] for chunk in log.chunks() for r in chunk]
+            # the newest records, never many more than max_records * compact_ratio
+            assert held == list(range(i + 1 - len(held), i + 1))
+            assert min(i + 1, 40) <= len(held) <= 60 + per_segment
+
+
+def test_compact_and_clear(tmp_path):
+    with open_log(tmp_path, max_bytes=1024, backup_count=10, max_records=None) as log:
+        for i in range(300):
+            log.append(record(i))
+        log.compact(25)
+        assert log.segments() == [log.filename]
+        assert [r["i"] for r in log.tail(100)] == list(range(275, 300))
+        log.append(record(300))
+        assert log.tail(2) == [record(299), record(300)]
+        log.clear()
+        assert log.tail(10) == []
+        log.append(record(0))
+        assert log.tail(10) == [record(0)]
+
+
+def test_torn_record_is_skipped(tmp_path):
+    filename = tmp_path / "history.log"
+    with open_log(tmp_path) as log:
+        log.append(record(0))
+    with open(filename, "ab") as f:
+        f.write(b'{"i": 1, "sta')  # crash mid-write
+    with open_log(tmp_path) as log:
+        log.append(record(2))
+        assert log.tail(5) == [record(0), record(2)]
+        assert [r for chunk in log.chunks() for r in chunk] == [record(0), record(2)]
@@ -0,0 +1,20 @@
+# tests/test_location_index.py
+from location_index import LocationIndex
+
+
+def test_short_name_ranks_first_among_many_prefix_matches():
+    names = [f"Admin Annex {i:04d}" for i in range(3000)] + ["Atrium"]
+    index = LocationIndex(names)
+    assert index.search("a", 3) == ["Atrium", "Admin Annex 0000", "Admin Annex 0001"]
+
+
+def test_label_starts_before_word_matches():
+    index = LocationIndex(["Engineering Faculty", "Faculty Club", "Science Faculty Annex"])
+    assert index.search("fac") == ["Faculty Club", "Engineering Faculty", "Science Faculty Annex"]
+
+
+def test_words_in_any_order_and_typos():
+    names = [f"Building {b} Room {r}" for b in range(40) for r in range(30)]
+    index = LocationIndex(names)
+    assert index.search("room 7 building 12", 1) == ["Building 12 Room 7"]
+    assert index.search("bulding 12 rom 7", 1) == ["Building 12 Room 7"]
@@ -0,0 +1,40 @@
+# tests/test_navigation.py
+import pytest
+
+from navigation import Navigation
+
+
+def test_unknown_method_rejected_on_cache_hit():
+    nav = Navigation()
+    nav.shortest_path("Main Gate", "Hostel")  # caches the tree from Main Gate
+    with pytest.raises(ValueError):
+        nav.shortest_path("Main Gate", "Canteen", method="bogus")
+
+
+def test_isochrones_assign_each_location_to_its_nearest_center():
+    nav = Navigation()
+    areas = nav.isochrones(["Library", "Auditorium"], max_distance=300)
+    assert areas["Library"] == {"Library": 0, "Canteen": 100, "Main Gate": 200, "Engineering Faculty": 250}
+    assert areas["Auditorium"] == {"Auditorium": 0, "Admin Block": 300, "Science Faculty": 300}
+
+
+def test_plan_tour_rejects_unreachable_stop():
+    nav = Navigation()
+    nav.close_edge("Canteen", "Hostel")
+    with pytest.raises(ValueError):
+        nav.plan_tour(["Main Gate", "Hostel", "Library"])
+
+
+def test_replacing_the_graph_refilters_facilities_and_closures():
+    nav = Navigation()
+    nav.set_facilities("Clinic", ["Library", "Hostel"])
+    nav.close_edge("Main Gate", "Library")
+    nav.graph = {"Main Gate": [("Hostel", 50)], "Hostel": [("Main Gate", 50)]}
+    assert nav.facilities == {"Clinic": ["Hostel"]}
+    assert nav.closed == {}
+    assert nav.nearest_facility("Clinic", "Main Gate") == ("Hostel", ["Main Gate", "Hostel"], 50)
+
+    nav.graph["Library"] = [("Main Gate", 10)]
+    nav.graph["Main Gate"].append(("Library", 10))
+    nav.graph_changed()
+    assert nav.nearest_facility("Clinic", "Main Gate") == ("Library", ["Main Gate", "Library"], 10)
@@ -0,0 +1,32 @@
+# tests/test_route_history.py
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from route_history import RouteHistory
+
+
+@pytest.fixture
+def new_york():
+    if not hasattr(time, "tzset"):
+        pytest.skip("needs time.tzset")
+    saved = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if saved is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = saved
+    time.tzset()
+
+
+def test_busiest_hours_use_each_records_own_utc_offset(new_york):
+    history = RouteHistory()
+    # 09:00 local in winter (UTC-5) and in summer (UTC-4)
+    for stamp in ("2026-01-15 09:10", "2026-07-15 09:20", "2026-07-16 09:40", "2026-01-16 17:00"):
+        moment = datetime.strptime(stamp, "%Y-%m-%d %H:%M")
+        history.add("Main Gate", "Library", 200, 0.001, timestamp=time.mktime(moment.timetuple()))
+    assert history.busiest_hours() == [(9, 3), (17, 1)]
@@ -0,0 +1,47 @@
+# tests/test_routing.py
+import itertools
+import random
+
+import pytest
+
+from navigation import Navigation
+from reference import check_route, random_campus
+
+
+def random_pairs(graph, count, seed):
+    rng = random.Random(seed)
+    names = list(graph)
+    return [tuple(rng.sample(names, 2)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed, floats", list(itertools.product(range(6), (False, True))))
+@pytest.mark.parametrize("method", ["dijkstra", "bidirectional"])
+def test_matches_plain_dijkstra(method, seed, floats):
+    graph, _ = random_campus(seed, floats=floats)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    for start, end in random_pairs(graph, 40, seed):
+        check_route(graph, start, end, *nav.shortest_path(start, end, method=method))
+
+
+@pytest.mark.parametrize("seed, floats", list(itertools.product(range(6), (False, True))))
+@pytest.mark.parametrize("method", ["astar", "alt"])
+def test_guided_search_matches_plain_dijkstra(method, seed, floats):
+    graph, coordinates = random_campus(seed, floats=floats)
+    nav = Navigation(coordinates, max_cached_trees=0)
+    nav.graph = graph
+    for start, end in random_pairs(graph, 40, seed):
+        check_route(graph, start, end, *nav.shortest_path(start, end, method=method))
+
+
+def test_landmarks_round_trip(tmp_path):
+    graph, _ = random_campus(1)
+    nav = Navigation(max_cached_trees=0)
+    nav.graph = graph
+    filename = str(tmp_path / "landmarks.bin")
+    built = nav.prepare_landmarks(4, filename)
+    loaded = nav.prepare_landmarks(4, filename)
+    assert loaded is not built
+    assert loaded.landmarks == built.landmarks
+    for start, end in random_pairs(graph, 20, 1):
+        check_route(graph, start, end, *nav.shortest_path(start, end, method="alt"))
@@ -0,0 +1,183 @@
+# text_index.py
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import islice
+
+from location_index import trigrams
+
+# Queries shorter than a trigram match too much of the history to be worth
+# an index lookup; they are answered by scanning
+MIN_INDEXED_QUERY = 3
+
+
+def tokens(text):
+    return set(re.findall(r"\w+", text.lower()))
+
+
+class TextIndex:
+    """Trigram and token inverted index over a first-in first-out stream of texts.
+
+    Documents get increasing integer ids and are evicted oldest first, so
+    every posting list is an array('q') sorted by id. Eviction only moves
+    the lowest live id; dead postings are trimmed in bulk once they make
+    up half of the index. lookup(doc_id) must return the text of a live
+    document and is used to confirm candidates.
+    """
+
+    def __init__(self, lookup):
+        self._lookup = lookup
+        self._grams = {}
+        self._tokens = {}
+        self._vocabulary = None  # sorted tokens, rebuilt after new ones appear
+        self._first = 0
+        self._next = 0
+        self._postings = 0
+        self._dead = 0
+        self._doc_postings = deque()  # postings added per live document
+
+    def __len__(self):
+        return self._next - self._first
+
+    def add(self, doc_id, text):
+        if doc_id < self._next:
+            raise ValueError("Document ids must increase")
+        lowered = text.lower()
+        count = 0
+        grams = self._grams
+        for gram in trigrams(lowered):
+            postings = grams.get(gram)
+            if postings is None:
+                postings = grams[gram] = array("q")
+            postings.append(doc_id)
+            count += 1
+        for token in tokens(lowered):
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = array("q")
+                self._vocabulary = None
+            postings.append(doc_id)
+            count += 1
+        if self._next == self._first:
+            self._first = doc_id
+        self._next = doc_id + 1
+        self._postings += count
+        self._doc_postings.append(count)
+
+    def evict_before(self, doc_id):
+        """Forget every document with an id below doc_id."""
+        gone = min(max(doc_id - self._first, 0), len(self._doc_postings))
+        if not gone:
+            return
+        for _ in range(gone):
+            self._dead += self._doc_postings.popleft()
+        self._first = doc_id
+        if self._dead * 2 > self._postings:
+            self._compact()
+
+    def clear(self):
+        self._grams.clear()
+        self._tokens.clear()
+        self._vocabulary = None
+        self._first = self._next
+        self._postings = self._dead = 0
+        self._doc_postings.clear()
+
+    def _compact(self):
+        first = self._first
+        for table in (self._grams, self._tokens):
+            for key in list(table):
+                postings = table[key]
+                dead = bisect_left(postings, first)
+                if dead == len(postings):
+                    del table[key]
+                elif dead:
+                    del postings[:dead]
+        self._vocabulary = None
+        self._postings -= self._dead
+        self._dead = 0
+
+    def _live(self, postings):
+        """(postings, index of the first live id); dead ids are skipped, not copied."""
+        return postings, bisect_left(postings, self._first)
+
+    @staticmethod
+    def _intersect(lists):
+        """Ids present in every (sorted array, start) pair, walking the shortest one."""
+        lists = sorted(lists, key=lambda live: len(live[0]) - live[1])
+        (shortest, start), others = lists[0], lists[1:]
+        cursors = [lo for _, lo in others]
+        result = []
+        for doc_id in islice(shortest, start, None):
+            for k, (other, _) in enumerate(others):
+                # ids only grow, so each search starts where the last one ended
+                i = cursors[k] = bisect_left(other, doc_id, cursors[k])
+                if i == len(other) or other[i] != doc_id:
+                    break
+            else:
+                result.append(doc_id)
+        return result
+
+    def search(self, query, mode="substring"):
+        """Ids of live documents matching query, oldest first.
+
+        mode is "substring" (case-insensitive, like str.__contains__),
+        "word" (every query word appears as a whole word) or "prefix"
+        (every query word starts some word).
+        """
+        q = query.lower()
+        if mode == "substring":
+            if len(q) < MIN_INDEXED_QUERY:
+                return [i for i in range(self._first, self._next) if q in self._lookup(i).lower()]
+            lists = []
+            for gram in {q[i:i + 3] for i in range(len(q) - 2)}:
+                postings = self._grams.get(gram)
+                if postings is None:
+                    return []
+                lists.append(self._live(postings))
+            # shared trigrams don't guarantee a contiguous match
+            return [i for i in self._intersect(lists) if q in self._lookup(i).lower()]
+        if mode == "word":
+            lists = []
+            for word in tokens(q):
+                postings = self._tokens.get(word)
+                if postings is None:
+                    return []
+                lists.append(self._live(postings))
+            return self._intersect(lists) if lists else []
+        if mode == "prefix":
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._tokens)
+            lists = []
+            for word in tokens(q):
+                lo = bisect_left(self._vocabulary, word)
+                hi = bisect_right(self._vocabulary, word + "￿")
+                ids = set()
+                for token in self._vocabulary[lo:hi]:
+                    postings, start = self._live(self._tokens[token])
+                    ids.update(islice(postings, start, None))
+                if not ids:
+                    return []
+                lists.append((sorted(ids), 0))
+            return self._intersect(lists) if lists else []
+        raise ValueError(f"Unknown search mode: {mode!r}")
+
+    def nbytes(self):
+        """Approximate memory used by the index itself (not the texts)."""
+        total = sys.getsizeof(self._grams) + sys.getsizeof(self._tokens)
+        for table in (self._grams, self._tokens):
+            for key, postings in table.items():
+                total += sys.getsizeof(key) + sys.getsizeof(postings)
+        return total + sys.getsizeof(self._doc_postings)
+
+    def stats(self):
+        return {
+            "documents": len(self),
+            "trigrams": len(self._grams),
+            "tokens": len(self._tokens),
+            "postings": self._postings - self._dead,
+            "dead_postings": self._dead,
+            "bytes": self.nbytes(),
+        }
@@ -0,0 +1,142 @@
+# tour.py
+import time
+
+import numpy as np
+
+# Exact Held-Karp DP is O(2^n * n^2); above this many stops use heuristics
+HELD_KARP_LIMIT = 13
+
+
+def plan_order(distances, return_to_start=False, time_limit_ms=None):
+    """Best visiting order over a square distance matrix, starting at stop 0.
+
+    Small instances are solved exactly with Held-Karp; larger ones start
+    from a nearest-neighbor tour improved with 2-opt and Or-opt moves until
+    no move helps or time_limit_ms runs out. Returns (order, cost).
+    """
+    d = np.asarray(distances, dtype=np.float64)
+    n = len(d)
+    if n <= 2:
+        order = list(range(n))
+        return order, _cost(d, order, return_to_start)
+    if n <= HELD_KARP_LIMIT:
+        return _held_karp(d, return_to_start)
+
+    deadline = None if time_limit_ms is None else time.perf_counter() + time_limit_ms / 1000
+    order = _nearest_neighbor(d)
+    improved = True
+    while improved and not _expired(deadline):
+        improved = _two_opt(d, order, return_to_start, deadline)
+        improved = _or_opt(d, order, return_to_start, deadline) or improved
+    return order, _cost(d, order, return_to_start)
+
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+
+def _cost(d, order, closed):
+    total = sum(d[a, b] for a, b in zip(order, order[1:]))
+    if closed and len(order) > 1:
+        total += d[order[-1], order[0]]
+    return float(total)
+
+
+def _held_karp(d, closed):
+    n = len(d)
+    full = 1 << (n - 1)
+    inf = float("inf")
+    # best[mask][j]: cheapest route from 0 through the stops in mask, ending at j
+    # (stop k >= 1 is bit k - 1)
+    best = [[inf] * n for _ in range(full)]
+    parent = [[-1] * n for _ in range(full)]
+    rows = d.tolist()
+    for j in range(1, n):
+        best[1 << (j - 1)][j] = rows[0][j]
+    for mask in range(1, full):
+        for j in range(1, n):
+            cost = best[mask][j]
+            if cost == inf or not mask & (1 << (j - 1)):
+                continue
+            row = rows[j]
+            for k in range(1, n):
+                bit = 1 << (k - 1)
+                if mask & bit:
+                    continue
+                candidate = cost + row[k]
+                if candidate < best[mask | bit][k]:
+                    best[mask | bit][k] = candidate
+                    parent[mask | bit][k] = j
+
+    mask = full - 1
+    ends = [(best[mask][j] + (rows[j][0] if closed else 0), j) for j in range(1, n)]
+    cost, j = min(ends)
+    order = []
+    while j > 0:
+        order.append(j)
+        mask, j = mask ^ (1 << (j - 1)), parent[mask][j]
+    order.append(0)
+    order.reverse()
+    return order, float(cost)
+
+
+def _nearest_neighbor(d):
+    order = [0]
+    left = set(range(1, len(d)))
+    while left:
+        last = order[-1]
+        nxt = min(left, key=lambda k: d[last, k])
+        order.append(nxt)
+        left.remove(nxt)
+    return order
+
+
+def _two_opt(d, order, closed, deadline):
+    """Reverse segments while that shortens the tour (stop 0 stays first)."""
+    n = len(order)
+    symmetric = np.array_equal(d, d.T)
+    improved = False
+    for i in range(1, n - 1):
+        if _expired(deadline):
+            break
+        for j in range(i + 1, n):
+            a, b = order[i - 1], order[i]
+            c = order[j]
+            e = order[(j + 1) % n] if closed or j + 1 < n else None
+            if symmetric:
+                before = d[a, b] + (d[c, e] if e is not None else 0)
+                after = d[a, c] + (d[b, e] if e is not None else 0)
+                better = after < before - 1e-9
+            else:
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                better = _cost(d, candidate, closed) < _cost(d, order, closed) - 1e-9
+            if better:
+                order[i:j + 1] = order[i:j + 1][::-1]
+                improved = True
+    return improved
+
+
+def _or_opt(d, order, closed, deadline):
+    """Move runs of 1-3 stops to a cheaper position (stop 0 stays first)."""
+    improved = False
+    for length in (1, 2, 3):
+        i = 1
+        while i + length <= len(order):
+            if _expired(deadline):
+                return improved
+            segment = order[i:i + length]
+            rest = order[:i] + order[i + length:]
+            current = _cost(d, order, closed)
+            best, best_pos = current, None
+            for pos in range(1, len(rest) + 1):
+                if pos == i:
+                    continue
+                candidate = rest[:pos] + segment + rest[pos:]
+                cost = _cost(d, candidate, closed)
+                if cost < best - 1e-9:
+                    best, best_pos = cost, pos
+            if best_pos is not None:
+                order[:] = rest[:best_pos] + segment + rest[best_pos:]
+                improved = True
+            i += 1
+    return improved
@@ -0,0 +1,132 @@
+# virtual_list.py
+import tkinter as tk
+from tkinter import ttk
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+
+class VirtualList(tk.Frame):
+    """Scrollable list that only puts the visible rows into its tk.Listbox.
+
+    The rows come from a source sequence (anything with len() and
+    slicing, e.g. a RingHistory or a list of search results) that is never
+    copied. The listbox holds `rows` lines; scrolling replaces them with
+    the matching slice of the source, so redraw cost depends on the window
+    height, not on the length of the source. While scrolled to the end the
+    view follows new entries.
+    """
+
+    def __init__(self, parent, source=(), rows=20, **listbox_options):
+        super().__init__(parent)
+        self.rows = rows
+        self.listbox = tk.Listbox(self, height=rows, activestyle="none", **listbox_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self.scroll(-self.rows))
+        self.listbox.bind("<Next>", lambda e: self.scroll(self.rows))
+        self.listbox.bind("<Home>", lambda e: self.scroll_to(0))
+        self.listbox.bind("<End>", lambda e: self.scroll_to(len(self.source)))
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.source = source
+        self._top = 0
+        self._follow = True
+        self._shown = []
+        self._selected = None
+        self.set_source(source)
+
+    def set_source(self, source, follow=True):
+        """Show another sequence, e.g. search results instead of the full history."""
+        self.source = source
+        self._selected = None
+        self._follow = follow
+        self._top = self._max_top() if follow else 0
+        self._render()
+
+    def appended(self, evicted=0):
+        """The source grew by one entry at the end and lost `evicted` from the front."""
+        if self._follow:
+            self._top = self._max_top()
+        else:
+            # keep the same entries on screen while older ones drop out
+            self._top = max(self._top - evicted, 0)
+        if self._selected is not None:
+            self._selected -= evicted
+            if self._selected < 0:
+                self._selected = None
+        self._render()
+
+    def selected(self):
+        """The source entry of the selected row, or None."""
+        if self._selected is None or self._selected >= len(self.source):
+            return None
+        return self.source[self._selected]
+
+    def _max_top(self):
+        return max(len(self.source) - self.rows, 0)
+
+    def scroll(self, rows):
+        self.scroll_to(self._top + rows)
+        return "break"
+
+    def scroll_to(self, top):
+        self._top = min(max(int(top), 0), self._max_top())
+        self._follow = self._top == self._max_top()
+        self._render()
+        return "break"
+
+    def _render(self):
+        top = self._top
+        shown = list(self.source[top:top + self.rows])
+        if shown != self._shown:
+            # two Tcl calls, however many rows changed
+            self.listbox.delete(0, tk.END)
+            if shown:
+                self.listbox.insert(tk.END, *shown)
+            self._shown = shown
+        self.listbox.selection_clear(0, tk.END)
+        if self._selected is not None and top <= self._selected < top + len(shown):
+            self.listbox.selection_set(self._selected - top)
+        n = len(self.source)
+        if n:
+            self.scrollbar.set(top / n, (top + len(shown)) / n)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.source)))
+        elif action == "scroll":
+            self.scroll(int(amount) * (self.rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS single steps
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-notches * WHEEL_ROWS)
+
+    def _on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self._selected = self._top + selection[0]
+
+    def _move_selection(self, step):
+        if self._selected is None:
+            target = self._top if step > 0 else self._top + len(self._shown) - 1
+        else:
+            target = self._selected + step
+        if not 0 <= target < len(self.source):
+            return "break"
+        self._selected = target
+        if target < self._top:
+            self.scroll_to(target)
+        elif target >= self._top + self.rows:
+            self.scroll_to(target - self.rows + 1)
+        else:
+            self._render()
+        return "break"